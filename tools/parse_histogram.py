@@ -61,7 +61,7 @@ def aggregate_bins(results, histogram_key: str):
     for r in results:
         bins = r.get(histogram_key, {}) or {}
         for bin_key, values in bins.items():
-            samples = values.get('samples', 0) or 0
+            samples = values.samples
             if samples == 0:
                 continue
             # Normalize key representation to string for consistent printing
@@ -149,13 +149,8 @@ def write_per_test_csv(out_path: Path, results, histogram_key: str, ordered_keys
             bins = r.get(histogram_key, {}) or {}
             row = [test_id, result]
             for k in ordered_keys:
-                v = bins.get(k, bins.get(int(k), {})) if k.isdigit() else bins.get(k, {})
-                cnt = 0
-                if isinstance(v, dict):
-                    cnt = int(v.get('samples', 0) or 0)
-                elif isinstance(v, (int, float)):
-                    cnt = int(v)
-                row.append(cnt)
+                v = bins.get(k, bins.get(int(k))) if k.isdigit() else bins.get(k)
+                row.append(v.samples if v is not None else 0)
             writer.writerow(row)
 
 
@@ -115,7 +115,7 @@ def write_csv_report(results, output_file, *, par2_score_seconds=None, solved_co
             wbv_bins = result.get('watcher_blocks_visited_bins', {}) or {}
             def pct_for(key):
                 v = wbv_bins.get(key)
-                return float(v.get('percentage')) if isinstance(v, dict) and 'percentage' in v else 0.0
+                return v.percentage if v is not None else 0.0
 
             row['watcher_blocks_visited_1_pct'] = pct_for(1)
             row['watcher_blocks_visited_2_pct'] = pct_for(2)
@@ -125,13 +125,13 @@ def write_csv_report(results, output_file, *, par2_score_seconds=None, solved_co
             for k, v in wbv_bins.items():
                 # Include Out of bounds values in >3 bucket
                 if k == 'out_of_bounds':
-                    gt3_pct += float(v.get('percentage', 0.0))
+                    gt3_pct += v.percentage
                 if isinstance(k, int) and k >= 4:
-                    gt3_pct += float(v.get('percentage', 0.0))
+                    gt3_pct += v.percentage
                 elif isinstance(k, str) and '-' in k:
                     start = int(k.split('-')[0])
                     if start >= 4:
-                        gt3_pct += float(v.get('percentage', 0.0))
+                        gt3_pct += v.percentage
             row['watcher_blocks_visited_gt3_pct'] = gt3_pct
 
             writer.writerow(row)
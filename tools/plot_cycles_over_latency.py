@@ -19,9 +19,18 @@ import matplotlib.pyplot as plt
 import csv
 import argparse
 from collections import defaultdict
+from operator import itemgetter
 from unified_parser import parse_log_directory
 
 
+# Cycle stage keys emitted by the unified parser, in plotting/CSV order
+_CYCLE_KEYS = (
+    'propagate_cycles', 'analyze_cycles', 'minimize_cycles', 
+    'backtrack_cycles', 'decision_cycles', 'reduce_db_cycles', 'restart_cycles'
+)
+_get_cycles = itemgetter(*_CYCLE_KEYS)
+
+
 def get_latency_from_directory(directory_name):
     """Extract L1 cache latency from directory name like 'logs_l1_10ns_mem_100ns'."""
     import re
@@ -46,6 +55,7 @@ def collect_cycle_data_from_logs(base_dir):
     """
     Collect cycle data from all L1 cache latency directories.
     Returns dict: {latency_ns: parsed_data_list}
+    Every returned entry has total_counted_cycles > 0, so consumers need not re-filter.
     """
     latency_dirs = [
         'logs_l1_1ns_mem_100ns',
@@ -85,6 +95,11 @@ def collect_cycle_data_from_logs(base_dir):
             print(f"Warning: No cycle data found in {latency_path}")
             continue
         
+        # Stages absent from a log count as zero cycles; lets consumers index keys directly
+        for r in cycle_results:
+            for cycle_type in _CYCLE_KEYS:
+                r.setdefault(cycle_type, 0)
+        
         data[latency_ns] = cycle_results
         print(f"  Processed {len(cycle_results)} files with cycle data")
     
@@ -95,6 +110,7 @@ def collect_memory_cycle_data_from_logs(base_dir):
     """
     Collect cycle data from all main memory latency directories.
     Returns dict: {memory_latency_ns: parsed_data_list}
+    Every returned entry has total_counted_cycles > 0, so consumers need not re-filter.
     """
     memory_dirs = [
         'logs_l1_1ns_mem_50ns',
@@ -134,44 +150,76 @@ def collect_memory_cycle_data_from_logs(base_dir):
             print(f"Warning: No cycle data found in {memory_path}")
             continue
         
+        # Stages absent from a log count as zero cycles; lets consumers index keys directly
+        for r in cycle_results:
+            for cycle_type in _CYCLE_KEYS:
+                r.setdefault(cycle_type, 0)
+        
         data[memory_latency_ns] = cycle_results
         print(f"  Processed {len(cycle_results)} files with cycle data")
     
     return data
 
 
+def aggregate_cycles(totals, stages):
+    """
+    Numeric core of the cycle averaging, operating on pre-extracted arrays.
+    totals: int64 array of shape (n,) with total counted cycles (all > 0)
+    stages: int64 array of shape (n, len(_CYCLE_KEYS)) with per-stage cycles
+    Returns (mean_total, geomean_total, stage_means).
+    """
+    mean_total = totals.mean()
+    geomean_total = np.exp(np.log(totals).sum() / len(totals))
+    stage_means = stages.mean(axis=0)
+    return mean_total, geomean_total, stage_means
+
+
 def calculate_cycle_averages(data):
     """
     Calculate average cycle counts for each latency.
     Returns:
     - avg_cycles: {latency_ns: {cycle_type: avg_cycles}}
     - avg_total_cycles: {latency_ns: avg_total_cycles}
+    - geomean_cycles: {latency_ns: geometric_mean_total_cycles}
     """
     avg_cycles = {}
     avg_total_cycles = {}
-    
-    # Cycle types to analyze
-    cycle_types = [
-        'propagate_cycles', 'analyze_cycles', 'minimize_cycles', 
-        'backtrack_cycles', 'decision_cycles', 'reduce_db_cycles', 'restart_cycles'
-    ]
+    geomean_cycles = {}
     
     for latency_ns, results in data.items():
-        avg_cycles[latency_ns] = {}
-        
-        # Calculate average total cycles
-        total_cycles = [r.get('total_counted_cycles', 0) for r in results]
-        avg_total_cycles[latency_ns] = np.mean(total_cycles)
+        # Extract totals and the (n_results, n_stages) stage matrix once per latency
+        totals = np.fromiter((r['total_counted_cycles'] for r in results), dtype=np.int64, count=len(results))
+        stages = np.array([_get_cycles(r) for r in results], dtype=np.int64)
         
-        # Calculate average for each cycle type
-        for cycle_type in cycle_types:
-            cycle_counts = [r.get(cycle_type, 0) for r in results]
-            avg_cycles[latency_ns][cycle_type] = np.mean(cycle_counts)
+        mean_total, geomean_total, stage_means = aggregate_cycles(totals, stages)
+        avg_total_cycles[latency_ns] = mean_total
+        geomean_cycles[latency_ns] = geomean_total
+        avg_cycles[latency_ns] = dict(zip(_CYCLE_KEYS, stage_means))
     
-    return avg_cycles, avg_total_cycles
+    return avg_cycles, avg_total_cycles, geomean_cycles
 
 
-def create_cycle_plots(avg_cycles, avg_total_cycles, data, output_dir='.'):
+def calculate_cycle_matrices(avg_cycles, avg_total_cycles):
+    """
+    Arrange average cycle counts into matrices indexed by (cycle_type, latency).
+    Latency columns follow sorted latency order.
+    Returns:
+    - cycle_data: array of shape (len(_CYCLE_KEYS), n_latencies) with average cycles
+    - pct: array of the same shape with each stage's percentage of total cycles
+    """
+    latencies = sorted(avg_cycles.keys())
+    
+    cycle_data = np.array([[avg_cycles[lat].get(ct, 0) for lat in latencies]
+                           for ct in _CYCLE_KEYS], dtype=np.float64)
+    totals = np.array([avg_total_cycles.get(lat, 0) for lat in latencies], dtype=np.float64)
+    
+    # Avoid division by zero for latencies without counted cycles
+    pct = np.divide(cycle_data * 100, totals, out=np.zeros_like(cycle_data), where=totals > 0)
+    
+    return cycle_data, pct
+
+
+def create_cycle_plots(avg_cycles, avg_total_cycles, geomean_cycles, cycle_data, pct, output_dir='.'):
     """Create stacked line charts showing cycle breakdown by L1 cache latency."""
     
     # Get sorted latencies
@@ -183,12 +231,6 @@ def create_cycle_plots(avg_cycles, avg_total_cycles, data, output_dir='.'):
     # Convert latencies to labels
     latency_labels = [f"{lat}ns" for lat in latencies]
     
-    # Cycle types for plotting
-    cycle_types = [
-        'propagate_cycles', 'analyze_cycles', 'minimize_cycles', 
-        'backtrack_cycles', 'decision_cycles', 'reduce_db_cycles', 'restart_cycles'
-    ]
-    
     # Nice labels for display
     cycle_labels = [
         'Propagate', 'Analyze', 'Minimize', 
@@ -210,11 +252,6 @@ def create_cycle_plots(avg_cycles, avg_total_cycles, data, output_dir='.'):
     fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 15))
     
     # Plot 1: Stacked area chart showing absolute cycle counts
-    cycle_data = np.zeros((len(cycle_types), len(latencies)))
-    for i, cycle_type in enumerate(cycle_types):
-        for j, latency_ns in enumerate(latencies):
-            cycle_data[i, j] = avg_cycles[latency_ns].get(cycle_type, 0)
-    
     ax1.stackplot(latency_values, *cycle_data, 
                   labels=cycle_labels, colors=colors, alpha=0.8)
     
@@ -230,15 +267,8 @@ def create_cycle_plots(avg_cycles, avg_total_cycles, data, output_dir='.'):
     ax1.grid(True, alpha=0.3)
     
     # Plot 2: Individual cycle stage percentages as line plots
-    for i, (cycle_type, cycle_label) in enumerate(zip(cycle_types, cycle_labels)):
-        percentages = []
-        for latency_ns in latencies:
-            total = avg_total_cycles.get(latency_ns, 1)  # Avoid division by zero
-            cycle_count = avg_cycles[latency_ns].get(cycle_type, 0)
-            percentage = (cycle_count / total) * 100 if total > 0 else 0
-            percentages.append(percentage)
-        
-        ax2.plot(latency_values, percentages, marker='o', linewidth=2, 
+    for i, cycle_label in enumerate(cycle_labels):
+        ax2.plot(latency_values, pct[i], marker='o', linewidth=2, 
                 label=cycle_label, color=colors[i])
     
     ax2.set_xlabel('L1 Cache Latency (ns)')
@@ -246,30 +276,11 @@ def create_cycle_plots(avg_cycles, avg_total_cycles, data, output_dir='.'):
     ax2.set_title('Individual Cycle Stage Percentages by L1 Cache Latency')
     ax2.legend(loc='upper left', bbox_to_anchor=(1.02, 1))
     ax2.grid(True, alpha=0.3)
-    ax2.set_ylim(0, max([max([
-        (avg_cycles[lat].get(ct, 0) / avg_total_cycles.get(lat, 1)) * 100 
-        for lat in latencies
-    ]) for ct in cycle_types]) + 5)  # Set y-limit based on max percentage + 5%
+    ax2.set_ylim(0, pct.max() + 5)  # Set y-limit based on max percentage + 5%
     
     # Plot 3: Geometric mean of total cycle counts across latencies
-    geomean_cycles = []
-    for latency_ns in latencies:
-        # Get all cycle counts for this latency from the data
-        cache_results = []
-        for lat, results in data.items():
-            if lat == latency_ns:
-                cycle_counts = [r.get('total_counted_cycles', 0) for r in results if r.get('total_counted_cycles', 0) > 0]
-                cache_results = cycle_counts
-                break
-        
-        if cache_results:
-            # Calculate geometric mean (using numpy's implementation)
-            geomean = np.exp(np.mean(np.log(cache_results)))
-            geomean_cycles.append(geomean)
-        else:
-            geomean_cycles.append(0)
-    
-    ax3.plot(latency_values, geomean_cycles, marker='o', linewidth=3, 
+    geomean_values = [geomean_cycles.get(lat, 0) for lat in latencies]
+    ax3.plot(latency_values, geomean_values, marker='o', linewidth=3, 
             color='#2E86AB', markersize=8)
     
     ax3.set_xlabel('L1 Cache Latency (ns)')
@@ -277,17 +288,15 @@ def create_cycle_plots(avg_cycles, avg_total_cycles, data, output_dir='.'):
     ax3.set_title('Geometric Mean of Total Cycle Counts by L1 Cache Latency')
     ax3.grid(True, alpha=0.3)
     
-    plt.tight_layout()
+    fig.tight_layout()
     
     # Save plots
     output_path = os.path.join(output_dir, 'cycle_breakdown_by_l1_latency.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    fig.savefig(output_path, dpi=300, bbox_inches='tight')
     print(f"Cycle plots saved to: {output_path}")
-    
-    plt.show()
 
 
-def create_memory_cycle_plots(avg_cycles, avg_total_cycles, data, output_dir='.'):
+def create_memory_cycle_plots(avg_cycles, avg_total_cycles, geomean_cycles, cycle_data, pct, output_dir='.'):
     """Create stacked line charts showing cycle breakdown by main memory latency."""
     
     # Get sorted latencies
@@ -296,12 +305,6 @@ def create_memory_cycle_plots(avg_cycles, avg_total_cycles, data, output_dir='.'
     # Use actual latency values for linear scale
     latency_values = latencies  # Keep as numbers for linear scale
     
-    # Cycle types for plotting
-    cycle_types = [
-        'propagate_cycles', 'analyze_cycles', 'minimize_cycles', 
-        'backtrack_cycles', 'decision_cycles', 'reduce_db_cycles', 'restart_cycles'
-    ]
-    
     # Nice labels for display
     cycle_labels = [
         'Propagate', 'Analyze', 'Minimize', 
@@ -323,11 +326,6 @@ def create_memory_cycle_plots(avg_cycles, avg_total_cycles, data, output_dir='.'
     fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 15))
     
     # Plot 1: Stacked area chart showing absolute cycle counts
-    cycle_data = np.zeros((len(cycle_types), len(latencies)))
-    for i, cycle_type in enumerate(cycle_types):
-        for j, latency_ns in enumerate(latencies):
-            cycle_data[i, j] = avg_cycles[latency_ns].get(cycle_type, 0)
-    
     ax1.stackplot(latency_values, *cycle_data, 
                   labels=cycle_labels, colors=colors, alpha=0.8)
     
@@ -343,15 +341,8 @@ def create_memory_cycle_plots(avg_cycles, avg_total_cycles, data, output_dir='.'
     ax1.grid(True, alpha=0.3)
     
     # Plot 2: Individual cycle stage percentages as line plots
-    for i, (cycle_type, cycle_label) in enumerate(zip(cycle_types, cycle_labels)):
-        percentages = []
-        for latency_ns in latencies:
-            total = avg_total_cycles.get(latency_ns, 1)  # Avoid division by zero
-            cycle_count = avg_cycles[latency_ns].get(cycle_type, 0)
-            percentage = (cycle_count / total) * 100 if total > 0 else 0
-            percentages.append(percentage)
-        
-        ax2.plot(latency_values, percentages, marker='o', linewidth=2, 
+    for i, cycle_label in enumerate(cycle_labels):
+        ax2.plot(latency_values, pct[i], marker='o', linewidth=2, 
                 label=cycle_label, color=colors[i])
     
     ax2.set_xlabel('Main Memory Latency (ns)')
@@ -359,30 +350,11 @@ def create_memory_cycle_plots(avg_cycles, avg_total_cycles, data, output_dir='.'
     ax2.set_title('Individual Cycle Stage Percentages by Main Memory Latency')
     ax2.legend(loc='upper left', bbox_to_anchor=(1.02, 1))
     ax2.grid(True, alpha=0.3)
-    ax2.set_ylim(0, max([max([
-        (avg_cycles[lat].get(ct, 0) / avg_total_cycles.get(lat, 1)) * 100 
-        for lat in latencies
-    ]) for ct in cycle_types]) + 5)  # Set y-limit based on max percentage + 5%
+    ax2.set_ylim(0, pct.max() + 5)  # Set y-limit based on max percentage + 5%
     
     # Plot 3: Geometric mean of total cycle counts across latencies
-    geomean_cycles = []
-    for latency_ns in latencies:
-        # Get all cycle counts for this latency from the data
-        cache_results = []
-        for lat, results in data.items():
-            if lat == latency_ns:
-                cycle_counts = [r.get('total_counted_cycles', 0) for r in results if r.get('total_counted_cycles', 0) > 0]
-                cache_results = cycle_counts
-                break
-        
-        if cache_results:
-            # Calculate geometric mean (using numpy's implementation)
-            geomean = np.exp(np.mean(np.log(cache_results)))
-            geomean_cycles.append(geomean)
-        else:
-            geomean_cycles.append(0)
-    
-    ax3.plot(latency_values, geomean_cycles, marker='o', linewidth=3, 
+    geomean_values = [geomean_cycles.get(lat, 0) for lat in latencies]
+    ax3.plot(latency_values, geomean_values, marker='o', linewidth=3, 
             color='#2E86AB', markersize=8)
     
     ax3.set_xlabel('Main Memory Latency (ns)')
@@ -390,14 +362,12 @@ def create_memory_cycle_plots(avg_cycles, avg_total_cycles, data, output_dir='.'
     ax3.set_title('Geometric Mean of Total Cycle Counts by Main Memory Latency')
     ax3.grid(True, alpha=0.3)
     
-    plt.tight_layout()
+    fig.tight_layout()
     
     # Save plots
     output_path = os.path.join(output_dir, 'cycle_breakdown_by_memory_latency.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    fig.savefig(output_path, dpi=300, bbox_inches='tight')
     print(f"Memory cycle plots saved to: {output_path}")
-    
-    plt.show()
 
 
 def get_dominant_cycle_stage(result):
@@ -434,32 +404,18 @@ def create_individual_test_cycle_plot(data, output_dir='.'):
     latency_values = latencies  # Keep as numbers for linear scale
     
     # Collect all test cycle counts for each latency
-    all_test_names = set()
-    test_data = {}  # {test_name: {latency_ns: total_cycles}}
+    test_data = defaultdict(dict)  # {test_name: {latency_ns: total_cycles}}
     
     # First pass: collect all unique test names and their data
     for latency_ns, results in data.items():
-        cycle_results = [r for r in results if r.get('total_counted_cycles', 0) > 0]
-        
-        for result in cycle_results:
-            test_name = result['test_case']
-            all_test_names.add(test_name)
-            
-            if test_name not in test_data:
-                test_data[test_name] = {}
-            
-            test_data[test_name][latency_ns] = result['total_counted_cycles']
+        for result in results:
+            test_data[result['test_case']][latency_ns] = result['total_counted_cycles']
     
     # Calculate average total cycles for each test across all latencies
-    test_avg_cycles = {}
-    for test_name in all_test_names:
-        cycle_counts = []
-        for latency_ns in latencies:
-            if latency_ns in test_data[test_name]:
-                cycle_counts.append(test_data[test_name][latency_ns])
-        
-        if cycle_counts:
-            test_avg_cycles[test_name] = np.mean(cycle_counts)
+    test_avg_cycles = {
+        test_name: sum(counts.values()) / len(counts)
+        for test_name, counts in test_data.items()
+    }
     
     # Sort tests by average total cycles and divide into 3 groups
     sorted_tests = sorted(test_avg_cycles.items(), key=lambda x: x[1])
@@ -483,13 +439,7 @@ def create_individual_test_cycle_plot(data, output_dir='.'):
     
     def plot_group(ax, group_tests, group_name):
         for i, test_name in enumerate(group_tests):
-            cycle_counts = []
-            valid_latencies = []
-            
-            for latency_ns in latencies:
-                if latency_ns in test_data[test_name]:
-                    cycle_counts.append(test_data[test_name][latency_ns])
-                    valid_latencies.append(latency_ns)
+            valid_latencies, cycle_counts = zip(*sorted(test_data[test_name].items()))
             
             if len(cycle_counts) > 1:  # Only plot if we have data for multiple latencies
                 color = diverse_colors[i % len(diverse_colors)]
@@ -514,16 +464,14 @@ def create_individual_test_cycle_plot(data, output_dir='.'):
         avg_cycles_group3 = np.mean([test_avg_cycles[test] for test in group3])
         plot_group(ax3, group3, f'High Cycle Count (avg: {avg_cycles_group3:.0f})')
     
-    plt.suptitle('Individual Test Total Cycle Counts by L1 Cache Latency (Grouped by Cycle Count)', 
+    fig.suptitle('Individual Test Total Cycle Counts by L1 Cache Latency (Grouped by Cycle Count)', 
                  fontsize=14, y=0.98)
-    plt.tight_layout()
+    fig.tight_layout()
     
     # Save the individual test plot
     output_path = os.path.join(output_dir, 'individual_test_cycle_counts_by_latency.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    fig.savefig(output_path, dpi=300, bbox_inches='tight')
     print(f"Individual test cycle plot saved to: {output_path}")
-    
-    plt.show()
 
 
 def create_individual_test_memory_cycle_plot(data, output_dir='.'):
@@ -536,32 +484,18 @@ def create_individual_test_memory_cycle_plot(data, output_dir='.'):
     latency_values = latencies  # Keep as numbers for linear scale
     
     # Collect all test cycle counts for each latency
-    all_test_names = set()
-    test_data = {}  # {test_name: {latency_ns: total_cycles}}
+    test_data = defaultdict(dict)  # {test_name: {latency_ns: total_cycles}}
     
     # First pass: collect all unique test names and their data
     for latency_ns, results in data.items():
-        cycle_results = [r for r in results if r.get('total_counted_cycles', 0) > 0]
-        
-        for result in cycle_results:
-            test_name = result['test_case']
-            all_test_names.add(test_name)
-            
-            if test_name not in test_data:
-                test_data[test_name] = {}
-            
-            test_data[test_name][latency_ns] = result['total_counted_cycles']
+        for result in results:
+            test_data[result['test_case']][latency_ns] = result['total_counted_cycles']
     
     # Calculate average total cycles for each test across all latencies
-    test_avg_cycles = {}
-    for test_name in all_test_names:
-        cycle_counts = []
-        for latency_ns in latencies:
-            if latency_ns in test_data[test_name]:
-                cycle_counts.append(test_data[test_name][latency_ns])
-        
-        if cycle_counts:
-            test_avg_cycles[test_name] = np.mean(cycle_counts)
+    test_avg_cycles = {
+        test_name: sum(counts.values()) / len(counts)
+        for test_name, counts in test_data.items()
+    }
     
     # Sort tests by average total cycles and divide into 3 groups
     sorted_tests = sorted(test_avg_cycles.items(), key=lambda x: x[1])
@@ -585,13 +519,7 @@ def create_individual_test_memory_cycle_plot(data, output_dir='.'):
     
     def plot_group(ax, group_tests, group_name):
         for i, test_name in enumerate(group_tests):
-            cycle_counts = []
-            valid_latencies = []
-            
-            for latency_ns in latencies:
-                if latency_ns in test_data[test_name]:
-                    cycle_counts.append(test_data[test_name][latency_ns])
-                    valid_latencies.append(latency_ns)
+            valid_latencies, cycle_counts = zip(*sorted(test_data[test_name].items()))
             
             if len(cycle_counts) > 1:  # Only plot if we have data for multiple latencies
                 color = diverse_colors[i % len(diverse_colors)]
@@ -616,66 +544,39 @@ def create_individual_test_memory_cycle_plot(data, output_dir='.'):
         avg_cycles_group3 = np.mean([test_avg_cycles[test] for test in group3])
         plot_group(ax3, group3, f'High Cycle Count (avg: {avg_cycles_group3:.0f})')
     
-    plt.suptitle('Individual Test Total Cycle Counts by Main Memory Latency (Grouped by Cycle Count)', 
+    fig.suptitle('Individual Test Total Cycle Counts by Main Memory Latency (Grouped by Cycle Count)', 
                  fontsize=14, y=0.98)
-    plt.tight_layout()
+    fig.tight_layout()
     
     # Save the individual test plot
     output_path = os.path.join(output_dir, 'individual_test_cycle_counts_by_memory_latency.png')
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    fig.savefig(output_path, dpi=300, bbox_inches='tight')
     print(f"Individual test memory cycle plot saved to: {output_path}")
-    
-    plt.show()
 
 
-def export_summary_csv(avg_cycles, avg_total_cycles, output_dir='.'):
+def export_summary_csv(avg_cycles, avg_total_cycles, cycle_data, pct, output_dir='.'):
     """Export summary CSV with averages by L1 cache latency."""
     
     csv_path = os.path.join(output_dir, 'cycle_analysis_latency_summary.csv')
     
-    # Get sorted latencies
+    # Get sorted latencies (matches the column order of cycle_data/pct)
     latencies = sorted(avg_cycles.keys())
     
-    # Cycle types
-    cycle_types = [
-        'propagate_cycles', 'analyze_cycles', 'minimize_cycles', 
-        'backtrack_cycles', 'decision_cycles', 'reduce_db_cycles', 'restart_cycles'
-    ]
-    
     # Define fieldnames
     fieldnames = ['l1_latency_ns', 'total_avg_cycles']
-    fieldnames.extend([f'avg_{ct}' for ct in cycle_types])
-    fieldnames.extend([f'pct_{ct.replace("_cycles", "")}' for ct in cycle_types])
+    fieldnames.extend([f'avg_{ct}' for ct in _CYCLE_KEYS])
+    fieldnames.extend([f'pct_{ct.replace("_cycles", "")}' for ct in _CYCLE_KEYS])
     
-    # Prepare data
-    csv_data = []
-    
-    for latency_ns in latencies:
-        total_avg = avg_total_cycles.get(latency_ns, 0)
-        
-        row = {
-            'l1_latency_ns': latency_ns,
-            'total_avg_cycles': total_avg
-        }
-        
-        # Add average cycle counts
-        for cycle_type in cycle_types:
-            avg_cycles_val = avg_cycles[latency_ns].get(cycle_type, 0)
-            row[f'avg_{cycle_type}'] = avg_cycles_val
-            
-            # Add percentage
-            if total_avg > 0:
-                percentage = (avg_cycles_val / total_avg) * 100
-            else:
-                percentage = 0
-            row[f'pct_{cycle_type.replace("_cycles", "")}'] = percentage
-        
-        csv_data.append(row)
+    # Prepare data as positional rows in fieldnames order
+    csv_data = [
+        [latency_ns, avg_total_cycles.get(latency_ns, 0), *cycle_data[:, i], *pct[:, i]]
+        for i, latency_ns in enumerate(latencies)
+    ]
     
     # Write CSV file
     with open(csv_path, 'w', newline='') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
+        writer = csv.writer(csvfile)
+        writer.writerow(fieldnames)
         writer.writerows(csv_data)
     
     print(f"Summary CSV exported to: {csv_path}")
@@ -790,16 +691,18 @@ def main():
     
     if l1_data:
         print("\nCalculating L1 cache cycle averages...")
-        l1_avg_cycles, l1_avg_total_cycles = calculate_cycle_averages(l1_data)
+        l1_avg_cycles, l1_avg_total_cycles, l1_geomean_cycles = calculate_cycle_averages(l1_data)
+        l1_cycle_data, l1_pct = calculate_cycle_matrices(l1_avg_cycles, l1_avg_total_cycles)
         
         print("\nCreating L1 cache cycle plots...")
-        create_cycle_plots(l1_avg_cycles, l1_avg_total_cycles, l1_data, args.output_dir)
+        create_cycle_plots(l1_avg_cycles, l1_avg_total_cycles, l1_geomean_cycles, l1_cycle_data, l1_pct,
+                           args.output_dir)
         
         print("\nCreating individual test L1 cache cycle plot...")
         create_individual_test_cycle_plot(l1_data, args.output_dir)
         
         print("\nExporting L1 cache summary CSV...")
-        export_summary_csv(l1_avg_cycles, l1_avg_total_cycles, args.output_dir)
+        export_summary_csv(l1_avg_cycles, l1_avg_total_cycles, l1_cycle_data, l1_pct, args.output_dir)
         
         print("\nExporting individual L1 latency CSVs...")
         export_individual_latency_csvs(l1_data, args.output_dir)
@@ -812,16 +715,21 @@ def main():
     
     if memory_data:
         print("\nCalculating main memory cycle averages...")
-        memory_avg_cycles, memory_avg_total_cycles = calculate_cycle_averages(memory_data)
+        memory_avg_cycles, memory_avg_total_cycles, memory_geomean_cycles = calculate_cycle_averages(memory_data)
+        memory_cycle_data, memory_pct = calculate_cycle_matrices(memory_avg_cycles, memory_avg_total_cycles)
         
         print("\nCreating main memory cycle plots...")
-        create_memory_cycle_plots(memory_avg_cycles, memory_avg_total_cycles, memory_data, args.output_dir)
+        create_memory_cycle_plots(memory_avg_cycles, memory_avg_total_cycles, memory_geomean_cycles,
+                                  memory_cycle_data, memory_pct, args.output_dir)
         
         print("\nCreating individual test main memory cycle plot...")
         create_individual_test_memory_cycle_plot(memory_data, args.output_dir)
     else:
         print("No main memory data collected.")
     
+    # Every plot keeps its own figure; show them together once all are saved
+    plt.show()
+    plt.close('all')
     print("\nDone!")
 
 
@@ -13,10 +13,66 @@ import sys
 import csv
 import argparse
 import numpy as np
-import matplotlib.pyplot as plt
 from pathlib import Path
 from collections import defaultdict
-from unified_parser import parse_log_directory
+from functools import lru_cache
+from unified_parser import parse_log_directory_parallel
+
+
+@lru_cache(maxsize=None)
+def parse_bin_key(bin_key):
+    """
+    Parse a histogram bin key into its (lo, hi) bin range.
+    
+    Single bins like 5 give (5, 5), ranges like '3-7' give (3, 7) and
+    'out_of_bounds' gives (-1, -1). Cached, since logs share a few keys.
+    """
+    if bin_key == 'out_of_bounds':
+        return -1, -1
+    if isinstance(bin_key, str) and '-' in bin_key:
+        lo, hi = map(int, bin_key.split('-'))
+        return lo, hi
+    return int(bin_key), int(bin_key)
+
+
+def average_histogram(logs, bins_field):
+    """
+    Average one histogram across logs.
+    
+    All logs are flattened once into parallel (bin index, percentage, samples)
+    arrays keyed by a canonical bin index; per-bin sums and log counts are then
+    single np.bincount reductions, so every average is taken over the logs
+    that report that bin.
+    
+    Args:
+        logs: List of parsed log data dictionaries containing bins_field
+        bins_field: Histogram key, e.g. 'watchers_bins'
+    
+    Returns:
+        Tuple of (bin_keys, avg_percentages, avg_samples), sorted by bin start
+        with 'out_of_bounds' last
+    """
+    # Flatten every (log, bin) entry, assigning each bin key an index on first sight
+    bin_index = {}
+    flat_idx, flat_pct, flat_samples = [], [], []
+    for log in logs:
+        for bin_key, values in log[bins_field].items():
+            flat_idx.append(bin_index.setdefault(bin_key, len(bin_index)))
+            flat_pct.append(values.percentage)
+            flat_samples.append(values.samples)
+    
+    flat_idx = np.asarray(flat_idx, dtype=np.intp)
+    n_bins = len(bin_index)
+    bin_logs = np.maximum(np.bincount(flat_idx, minlength=n_bins), 1)
+    avg_pct = np.bincount(flat_idx, weights=flat_pct, minlength=n_bins) / bin_logs
+    avg_samples = np.bincount(flat_idx, weights=flat_samples, minlength=n_bins) / bin_logs
+    
+    # Bin starts in index order; out_of_bounds (-1) sorts past every real bin
+    keys = list(bin_index)
+    starts = np.fromiter((parse_bin_key(k)[0] for k in keys), dtype=np.int64, count=n_bins)
+    starts[starts < 0] = np.iinfo(np.int64).max
+    order = np.argsort(starts, kind='stable')
+    return [keys[i] for i in order], avg_pct[order], avg_samples[order]
 
 
 def create_histogram_plots(data_points, output_dir='.'):
@@ -42,40 +98,17 @@ def create_histogram_plots(data_points, output_dir='.'):
         print("No variables histogram data available")
         return
     
+    # Imported here so CSV-only users of this module skip matplotlib's startup cost
+    import matplotlib.pyplot as plt
+    
     # 2x2 layout
-    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12), constrained_layout=True)
     ax1, ax2, ax3, ax4 = axes.ravel()
     
     # Average Watchers Histogram
-    watchers_bins = {}
-    watchers_counts = {}
-    max_watcher_bin = 0
-    for log in watchers_data:
-        bins = log.get('watchers_bins', {})
-        for bin_key, values in bins.items():
-            if isinstance(bin_key, str) and '-' in bin_key:
-                start, end = map(int, bin_key.split('-'))
-                max_watcher_bin = max(max_watcher_bin, end)
-            else:
-                max_watcher_bin = max(max_watcher_bin, int(bin_key) if bin_key != 'out_of_bounds' else 0)
-            if bin_key not in watchers_bins:
-                watchers_bins[bin_key] = []
-                watchers_counts[bin_key] = []
-            watchers_bins[bin_key].append(values['percentage'])
-            watchers_counts[bin_key].append(values['samples'])
-    watchers_avg = {k: np.mean(v) for k, v in watchers_bins.items()}
-    watchers_count_avg = {k: np.mean(v) for k, v in watchers_counts.items()}
-    sorted_watchers_bins = sorted(watchers_avg.items(), key=lambda x: (
-        float('inf') if x[0] == 'out_of_bounds' else
-        (int(x[0].split('-')[0]) if isinstance(x[0], str) and '-' in x[0] else int(x[0]))
-    ))
-    watchers_x, watchers_y, watchers_labels, watchers_counts_list = [], [], [], []
-    for bin_key, avg_percent in sorted_watchers_bins:
-        idx = len(watchers_x)
-        watchers_x.append(idx)
-        watchers_labels.append('Out of\nbounds' if bin_key == 'out_of_bounds' else str(bin_key))
-        watchers_y.append(avg_percent)
-        watchers_counts_list.append(watchers_count_avg[bin_key])
+    watchers_keys, watchers_y, watchers_counts_list = average_histogram(watchers_data, 'watchers_bins')
+    watchers_x = list(range(len(watchers_keys)))
+    watchers_labels = ['Out of\nbounds' if k == 'out_of_bounds' else str(k) for k in watchers_keys]
     bars1 = ax1.bar(watchers_x, watchers_y, alpha=0.8, color='steelblue', edgecolor='black', linewidth=0.5)
     ax1.set_xticks(watchers_x)
     ax1.set_xticklabels(watchers_labels, rotation=45)
@@ -83,42 +116,13 @@ def create_histogram_plots(data_points, output_dir='.'):
     ax1.set_ylabel('Percentage of Samples (%)')
     ax1.set_title(f'Average Parallel Watchers Distribution (from {len(watchers_data)} logs)')
     ax1.grid(True, axis='y', alpha=0.3)
-    for bar, count in zip(bars1, watchers_counts_list):
-        h = bar.get_height()
-        ax1.annotate(f'{h:.1f}%\n({count:.0f})', xy=(bar.get_x() + bar.get_width() / 2, h),
-                     xytext=(0, 3), textcoords="offset points", ha='center', va='bottom',
-                     fontsize=9, fontweight='bold')
+    ax1.bar_label(bars1, labels=[f'{h:.1f}%\n({c:.0f})' for h, c in zip(watchers_y, watchers_counts_list)],
+                  padding=3, fontsize=9, fontweight='bold')
     
     # Average Variables Histogram
-    variables_bins = {}
-    variables_counts = {}
-    max_variable_bin = 0
-    for log in variables_data:
-        bins = log.get('variables_bins', {})
-        for bin_key, values in bins.items():
-            if isinstance(bin_key, str) and '-' in bin_key:
-                start, end = map(int, bin_key.split('-'))
-                max_variable_bin = max(max_variable_bin, end)
-            else:
-                max_variable_bin = max(max_variable_bin, int(bin_key) if bin_key != 'out_of_bounds' else 0)
-            if bin_key not in variables_bins:
-                variables_bins[bin_key] = []
-                variables_counts[bin_key] = []
-            variables_bins[bin_key].append(values['percentage'])
-            variables_counts[bin_key].append(values['samples'])
-    variables_avg = {k: np.mean(v) for k, v in variables_bins.items()}
-    variables_count_avg = {k: np.mean(v) for k, v in variables_counts.items()}
-    sorted_variables_bins = sorted(variables_avg.items(), key=lambda x: (
-        float('inf') if x[0] == 'out_of_bounds' else
-        (int(x[0].split('-')[0]) if isinstance(x[0], str) and '-' in x[0] else int(x[0]))
-    ))
-    variables_x, variables_y, variables_labels, variables_counts_list = [], [], [], []
-    for bin_key, avg_percent in sorted_variables_bins:
-        idx = len(variables_x)
-        variables_x.append(idx)
-        variables_labels.append('Out of\nbounds' if bin_key == 'out_of_bounds' else str(bin_key))
-        variables_y.append(avg_percent)
-        variables_counts_list.append(variables_count_avg[bin_key])
+    variables_keys, variables_y, variables_counts_list = average_histogram(variables_data, 'variables_bins')
+    variables_x = list(range(len(variables_keys)))
+    variables_labels = ['Out of\nbounds' if k == 'out_of_bounds' else str(k) for k in variables_keys]
     bars2 = ax2.bar(variables_x, variables_y, alpha=0.8, color='indianred', edgecolor='black', linewidth=0.5)
     ax2.set_xticks(variables_x)
     ax2.set_xticklabels(variables_labels, rotation=45)
@@ -126,37 +130,14 @@ def create_histogram_plots(data_points, output_dir='.'):
     ax2.set_ylabel('Percentage of Samples (%)')
     ax2.set_title(f'Average Parallel Variables Distribution (from {len(variables_data)} logs)')
     ax2.grid(True, axis='y', alpha=0.3)
-    for bar, count in zip(bars2, variables_counts_list):
-        h = bar.get_height()
-        ax2.annotate(f'{h:.1f}%\n({count:.0f})', xy=(bar.get_x() + bar.get_width() / 2, h),
-                     xytext=(0, 3), textcoords="offset points", ha='center', va='bottom',
-                     fontsize=9, fontweight='bold')
+    ax2.bar_label(bars2, labels=[f'{h:.1f}%\n({c:.0f})' for h, c in zip(variables_y, variables_counts_list)],
+                  padding=3, fontsize=9, fontweight='bold')
 
     # Watchers Occupancy Histogram (subplot 3)
     if occupancy_data:
-        occ_bins = {}
-        occ_counts = {}
-        for log in occupancy_data:
-            bins = log.get('watchers_occupancy_bins', {})
-            for bin_key, values in bins.items():
-                if bin_key not in occ_bins:
-                    occ_bins[bin_key] = []
-                    occ_counts[bin_key] = []
-                occ_bins[bin_key].append(values['percentage'])
-                occ_counts[bin_key].append(values['samples'])
-        occ_avg = {k: np.mean(v) for k, v in occ_bins.items()}
-        occ_count_avg = {k: np.mean(v) for k, v in occ_counts.items()}
-        sorted_occ_bins = sorted(occ_avg.items(), key=lambda x: (
-            float('inf') if x[0] == 'out_of_bounds' else
-            (int(x[0].split('-')[0]) if isinstance(x[0], str) and '-' in x[0] else int(x[0]))
-        ))
-        occ_x, occ_y, occ_labels, occ_counts_list = [], [], [], []
-        for bin_key, avg_percent in sorted_occ_bins:
-            idx = len(occ_x)
-            occ_x.append(idx)
-            occ_labels.append('Out of\nbounds' if bin_key == 'out_of_bounds' else str(bin_key))
-            occ_y.append(avg_percent)
-            occ_counts_list.append(occ_count_avg[bin_key])
+        occ_keys, occ_y, occ_counts_list = average_histogram(occupancy_data, 'watchers_occupancy_bins')
+        occ_x = list(range(len(occ_keys)))
+        occ_labels = ['Out of\nbounds' if k == 'out_of_bounds' else str(k) for k in occ_keys]
         bars3 = ax3.bar(occ_x, occ_y, alpha=0.8, color='darkseagreen', edgecolor='black', linewidth=0.5)
         ax3.set_xticks(occ_x)
         ax3.set_xticklabels(occ_labels, rotation=45)
@@ -164,40 +145,17 @@ def create_histogram_plots(data_points, output_dir='.'):
         ax3.set_ylabel('Percentage of Samples (%)')
         ax3.set_title(f'Average Watchers Occupancy Distribution (from {len(occupancy_data)} logs)')
         ax3.grid(True, axis='y', alpha=0.3)
-        for bar, count in zip(bars3, occ_counts_list):
-            h = bar.get_height()
-            ax3.annotate(f'{h:.1f}%\n({count:.0f})', xy=(bar.get_x() + bar.get_width() / 2, h),
-                         xytext=(0, 3), textcoords="offset points", ha='center', va='bottom',
-                         fontsize=9, fontweight='bold')
+        ax3.bar_label(bars3, labels=[f'{h:.1f}%\n({c:.0f})' for h, c in zip(occ_y, occ_counts_list)],
+                      padding=3, fontsize=9, fontweight='bold')
     else:
         ax3.axis('off')
         ax3.text(0.5, 0.5, 'No watchers occupancy data', ha='center', va='center', fontsize=12)
 
     # Watcher Blocks Visited Histogram (subplot 4)
     if blocks_data:
-        blk_bins = {}
-        blk_counts = {}
-        for log in blocks_data:
-            bins = log.get('watcher_blocks_visited_bins', {})
-            for bin_key, values in bins.items():
-                if bin_key not in blk_bins:
-                    blk_bins[bin_key] = []
-                    blk_counts[bin_key] = []
-                blk_bins[bin_key].append(values['percentage'])
-                blk_counts[bin_key].append(values['samples'])
-        blk_avg = {k: np.mean(v) for k, v in blk_bins.items()}
-        blk_count_avg = {k: np.mean(v) for k, v in blk_counts.items()}
-        sorted_blk_bins = sorted(blk_avg.items(), key=lambda x: (
-            float('inf') if x[0] == 'out_of_bounds' else
-            (int(x[0].split('-')[0]) if isinstance(x[0], str) and '-' in x[0] else int(x[0]))
-        ))
-        blk_x, blk_y, blk_labels, blk_counts_list = [], [], [], []
-        for bin_key, avg_percent in sorted_blk_bins:
-            idx = len(blk_x)
-            blk_x.append(idx)
-            blk_labels.append('Out of\nbounds' if bin_key == 'out_of_bounds' else str(bin_key))
-            blk_y.append(avg_percent)
-            blk_counts_list.append(blk_count_avg[bin_key])
+        blk_keys, blk_y, blk_counts_list = average_histogram(blocks_data, 'watcher_blocks_visited_bins')
+        blk_x = list(range(len(blk_keys)))
+        blk_labels = ['Out of\nbounds' if k == 'out_of_bounds' else str(k) for k in blk_keys]
         bars4 = ax4.bar(blk_x, blk_y, alpha=0.8, color='mediumpurple', edgecolor='black', linewidth=0.5)
         ax4.set_xticks(blk_x)
         ax4.set_xticklabels(blk_labels, rotation=45)
@@ -205,21 +163,41 @@ def create_histogram_plots(data_points, output_dir='.'):
         ax4.set_ylabel('Percentage of Samples (%)')
         ax4.set_title(f'Average Watcher Blocks Visited Distribution (from {len(blocks_data)} logs)')
         ax4.grid(True, axis='y', alpha=0.3)
-        for bar, count in zip(bars4, blk_counts_list):
-            h = bar.get_height()
-            ax4.annotate(f'{h:.1f}%\n({count:.0f})', xy=(bar.get_x() + bar.get_width() / 2, h),
-                         xytext=(0, 3), textcoords="offset points", ha='center', va='bottom',
-                         fontsize=9, fontweight='bold')
+        ax4.bar_label(bars4, labels=[f'{h:.1f}%\n({c:.0f})' for h, c in zip(blk_y, blk_counts_list)],
+                      padding=3, fontsize=9, fontweight='bold')
     else:
         ax4.axis('off')
         ax4.text(0.5, 0.5, 'No watcher blocks visited data', ha='center', va='center', fontsize=12)
 
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, 'parallel_histograms.png'), dpi=300, bbox_inches='tight')
+    # Constrained layout already fits the panels; skip tight_layout and the bbox_inches re-layout
+    plt.savefig(os.path.join(output_dir, 'parallel_histograms.png'), dpi=300)
     print(f"Histogram plots saved to: {os.path.join(output_dir, 'parallel_histograms.png')}")
     plt.close()
 
 
+def expand_range_bins(ranges):
+    """
+    Spread range bins evenly over the integer bins they cover.
+    
+    Args:
+        ranges: List of (start, end, samples, percentage) tuples with start < end
+        
+    Returns:
+        Tuple of (bin_idx, counts, pcts) arrays, where bin_idx is the 0-based
+        per-bin column offset (bin i at i-1; bin 0 has no column)
+    """
+    start, end, samples, pct = (np.array(v) for v in zip(*ranges))
+    widths = end - start + 1
+    first = np.maximum(start, 1)
+    spans = end - first + 1
+    
+    # Consecutive column offsets first-1..end-1 for every range, back to back
+    run_start = np.repeat(np.cumsum(spans) - spans, spans)
+    bin_idx = np.arange(spans.sum()) - run_start + np.repeat(first - 1, spans)
+    
+    return bin_idx, np.repeat(samples / widths, spans), np.repeat(pct / widths, spans)
+
+
 def export_histogram_csv(data_points, output_file='histogram_data.csv'):
     """
     Export histogram data to CSV.
@@ -237,30 +215,18 @@ def export_histogram_csv(data_points, output_file='histogram_data.csv'):
         print("No histogram data available to export")
         return
     
+    # Parse every log's bins once into (start, end, samples, percentage) tuples;
+    # they feed both the max-bin scan and the row fill below
+    parsed_bins = [
+        {prefix: [(*parse_bin_key(bin_key), values.samples, values.percentage)
+                  for bin_key, values in log.get(f'{prefix}_bins', {}).items()]
+         for prefix in ('watchers', 'variables')}
+        for log in filtered_data
+    ]
+    
     # Find the max bin number across all logs for both watchers and variables
-    max_watcher_bin = 0
-    max_variable_bin = 0
-    
-    for log in filtered_data:
-        if 'watchers_bins' in log:
-            for bin_key in log['watchers_bins']:
-                if bin_key == 'out_of_bounds':
-                    continue
-                if isinstance(bin_key, str) and '-' in bin_key:
-                    start, end = map(int, bin_key.split('-'))
-                    max_watcher_bin = max(max_watcher_bin, end)
-                else:
-                    max_watcher_bin = max(max_watcher_bin, int(bin_key))
-        
-        if 'variables_bins' in log:
-            for bin_key in log['variables_bins']:
-                if bin_key == 'out_of_bounds':
-                    continue
-                if isinstance(bin_key, str) and '-' in bin_key:
-                    start, end = map(int, bin_key.split('-'))
-                    max_variable_bin = max(max_variable_bin, end)
-                else:
-                    max_variable_bin = max(max_variable_bin, int(bin_key))
+    max_watcher_bin = max((end for bins in parsed_bins for _, end, _, _ in bins['watchers'] if end >= 0), default=0)
+    max_variable_bin = max((end for bins in parsed_bins for _, end, _, _ in bins['variables'] if end >= 0), default=0)
     
     # Prepare headers for the CSV file
     basic_headers = [
@@ -288,68 +254,58 @@ def export_histogram_csv(data_points, output_file='histogram_data.csv'):
         variables_count_headers + variables_pct_headers
     )
     
-    # Prepare data rows
-    rows = []
+    # Column position of every header
+    col_index = {header: i for i, header in enumerate(all_headers)}
     
-    for log in filtered_data:
-        row = {header: '' for header in all_headers}  # Initialize empty row
-        
-        # Fill basic info
-        for field in basic_headers:
-            if field in log:
-                row[field] = log[field]
-        
-        # Fill watchers data
-        if 'watchers_bins' in log:
-            for bin_key, values in log['watchers_bins'].items():
-                if bin_key == 'out_of_bounds':
-                    row['watchers_out_of_bounds_count'] = values['samples']
-                    row['watchers_out_of_bounds_pct'] = values['percentage']
-                else:
-                    # Handle bin ranges and single bins
-                    if isinstance(bin_key, str) and '-' in bin_key:
-                        start, end = map(int, bin_key.split('-'))
-                        for i in range(start, end + 1):
-                            # For ranges, distribute samples equally across the range
-                            count_per_bin = values['samples'] / (end - start + 1)
-                            pct_per_bin = values['percentage'] / (end - start + 1)
-                            row[f'watchers_{i}_count'] = count_per_bin
-                            row[f'watchers_{i}_pct'] = pct_per_bin
-                    else:
-                        bin_num = int(bin_key)
-                        row[f'watchers_{bin_num}_count'] = values['samples']
-                        row[f'watchers_{bin_num}_pct'] = values['percentage']
-        
-        # Fill variables data
-        if 'variables_bins' in log:
-            for bin_key, values in log['variables_bins'].items():
-                if bin_key == 'out_of_bounds':
-                    row['variables_out_of_bounds_count'] = values['samples']
-                    row['variables_out_of_bounds_pct'] = values['percentage']
-                else:
-                    # Handle bin ranges and single bins
-                    if isinstance(bin_key, str) and '-' in bin_key:
-                        start, end = map(int, bin_key.split('-'))
-                        for i in range(start, end + 1):
-                            # For ranges, distribute samples equally across the range
-                            count_per_bin = values['samples'] / (end - start + 1)
-                            pct_per_bin = values['percentage'] / (end - start + 1)
-                            row[f'variables_{i}_count'] = count_per_bin
-                            row[f'variables_{i}_pct'] = pct_per_bin
-                    else:
-                        bin_num = int(bin_key)
-                        row[f'variables_{bin_num}_count'] = values['samples']
-                        row[f'variables_{bin_num}_pct'] = values['percentage']
-        
-        rows.append(row)
+    # Per-bin column indices (bin i at position i-1), built once per max bin
+    max_bins = {'watchers': max_watcher_bin, 'variables': max_variable_bin}
+    count_cols = {
+        prefix: np.array([col_index[f'{prefix}_{i}_count'] for i in range(1, max_bin + 1)], dtype=np.intp)
+        for prefix, max_bin in max_bins.items()
+    }
+    pct_cols = {
+        prefix: np.array([col_index[f'{prefix}_{i}_pct'] for i in range(1, max_bin + 1)], dtype=np.intp)
+        for prefix, max_bin in max_bins.items()
+    }
+    
+    # Stream rows to the CSV as each log is processed, reusing one row buffer;
+    # '' marks cells without data
+    row = np.empty(len(all_headers), dtype=object)
     
-    # Write CSV file
     with open(output_file, 'w', newline='') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=all_headers)
-        writer.writeheader()
-        writer.writerows(rows)
+        writer = csv.writer(csvfile)
+        writer.writerow(all_headers)
+        
+        for log, log_bins in zip(filtered_data, parsed_bins):
+            row.fill('')
+            
+            # Fill basic info
+            for col, field in enumerate(basic_headers):
+                if field in log:
+                    row[col] = log[field]
+            
+            # Fill watchers and variables data
+            for prefix, bins in log_bins.items():
+                ranges = []
+                for start, end, samples, percentage in bins:
+                    if start < 0:
+                        row[col_index[f'{prefix}_out_of_bounds_count']] = samples
+                        row[col_index[f'{prefix}_out_of_bounds_pct']] = percentage
+                    elif start != end:
+                        ranges.append((start, end, samples, percentage))
+                    elif start >= 1:
+                        row[count_cols[prefix][start - 1]] = samples
+                        row[pct_cols[prefix][start - 1]] = percentage
+                
+                if ranges:
+                    # For ranges, distribute samples equally across the range
+                    idx, counts, pcts = expand_range_bins(ranges)
+                    row[count_cols[prefix][idx]] = counts
+                    row[pct_cols[prefix][idx]] = pcts
+            
+            writer.writerow(row.tolist())
     
-    print(f"Exported {len(rows)} records to {output_file}")
+    print(f"Exported {len(filtered_data)} records to {output_file}")
 
 
 def main():
@@ -364,14 +320,16 @@ def main():
                        help="Output filename for histogram plots")
     parser.add_argument("--output-dir", dest="output_dir", default=".",
                        help="Directory to save outputs")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(),
+                       help="Number of worker processes used to parse log files")
     
     args = parser.parse_args()
     
     # Create output directory if it doesn't exist
     os.makedirs(args.output_dir, exist_ok=True)
     
-    # Process log files using unified parser
-    data_points = parse_log_directory(args.log_dir, exclude_summary=True)
+    # Process log files using unified parser, one log per worker task
+    data_points = parse_log_directory_parallel(args.log_dir, exclude_summary=True, workers=args.jobs)
     
     if not data_points:
         print("No valid data found in the log files.")
@@ -18,25 +18,62 @@ Data structures shown:
 - Variables
 - Watchlist
 
-Usage: python plot_l1_miss_rate.py <cache_sizes_dir> <base_folder_name> [output.pdf]
+Usage: python plot_l1_miss_rate.py <cache_sizes_dir> <base_folder_name> [output.pdf] [--cache-dir DIR] [--jobs N]
 """
 
-import sys
+import argparse
+import os
+import re
 from pathlib import Path
-import matplotlib.pyplot as plt
 import numpy as np
-from unified_parser import parse_log_directory
+from unified_parser import parse_log_directories_parallel
+
+# L1 components tracked by the parser and the per-test counters aggregated from them
+_L1_COMPONENTS = ('heap', 'varactivity', 'clauses', 'variables', 'watches')
+_L1_COUNTER_KEYS = ('l1_total_requests', 'l1_total_miss_rate') + tuple(
+    f'l1_{component}_{field}' for component in _L1_COMPONENTS for field in ('total', 'misses')
+)
+_L1_COUNTER_INDEX = {key: i for i, key in enumerate(_L1_COUNTER_KEYS)}
+
+# Cache size suffix of a size folder name, e.g. 'base_128KB'
+_CACHE_KB_RE = re.compile(r'(\d+)KB')
+
+# Results excluded from the miss rate averages (SAT/UNSAT/TIMEOUT are kept)
+_INVALID_RESULTS = frozenset(('ERROR', 'UNKNOWN'))
+
+# Data structures in the breakdown, with their legend labels and area colors
+_DATA_STRUCTURES = ('priority_queue', 'clauses', 'variables', 'watchlist')
+_LABELS = {
+    'priority_queue': 'Priority Queue',
+    'clauses': 'Clauses',
+    'variables': 'Variables',
+    'watchlist': 'Watchlist'
+}
+_COLORS = {
+    'priority_queue': '#8dd3c7',
+    'clauses': '#ffffb3',
+    'variables': '#bebada',
+    'watchlist': '#fb8072'
+}
+
+# Miss rates reported per cache size: the total and its per-structure contributions
+_MISS_RATE_KEYS = ('total',) + _DATA_STRUCTURES
 
 
 def extract_cache_size_kb(folder_name):
     """Extract cache size in KB from folder name like 'base_64KB' or 'base_512KB'."""
-    import re
-    match = re.search(r'(\d+)KB', folder_name)
+    match = _CACHE_KB_RE.search(folder_name)
     if match:
         return int(match.group(1))
     return None
 
 
+def _seed_dirs(folder):
+    """Sorted names of the seed* subdirectories of folder, from a single os.scandir pass."""
+    with os.scandir(folder) as entries:
+        return sorted(e.name for e in entries if e.name.startswith('seed') and e.is_dir())
+
+
 def compute_l1_miss_rates(results):
     """Compute L1 miss rates across finished tests.
     
@@ -53,80 +90,33 @@ def compute_l1_miss_rates(results):
     So they add up to the total miss rate.
     """
     # Filter to valid tests (exclude only ERROR and UNKNOWN)
-    finished = [r for r in results if r.get('result') not in ('ERROR', 'UNKNOWN')]
+    finished = [r for r in results if r.get('result') not in _INVALID_RESULTS]
     
     if not finished:
         return {}
     
-    # Aggregate actual miss and request counts
-    total_requests = 0
-    total_hits = 0
-    total_misses = 0
-    
-    heap_requests = 0
-    heap_hits = 0
-    heap_misses = 0
-    
-    varactivity_requests = 0
-    varactivity_hits = 0
-    varactivity_misses = 0
-    
-    clauses_requests = 0
-    clauses_hits = 0
-    clauses_misses = 0
-    
-    variables_requests = 0
-    variables_hits = 0
-    variables_misses = 0
-    
-    watches_requests = 0
-    watches_hits = 0
-    watches_misses = 0
-    
-    for r in finished:
-        # Total (use hits + misses for more accurate counts)
-        total_req = r.get('l1_total_requests', 0) or 0
-        if total_req > 0:
-            total_requests += total_req
-            # Try to get hits/misses if available, otherwise compute from miss rate
-            # Note: total doesn't have separate hits/misses in the parser
-            total_miss_rate = r.get('l1_total_miss_rate', 0) or 0
-            total_misses += int(total_req * (total_miss_rate / 100.0))
-        
-        # Heap
-        heap_req = r.get('l1_heap_total', 0) or 0
-        if heap_req > 0:
-            heap_requests += heap_req
-            heap_hits += r.get('l1_heap_hits', 0) or 0
-            heap_misses += r.get('l1_heap_misses', 0) or 0
-        
-        # VarActivity
-        var_act_req = r.get('l1_varactivity_total', 0) or 0
-        if var_act_req > 0:
-            varactivity_requests += var_act_req
-            varactivity_hits += r.get('l1_varactivity_hits', 0) or 0
-            varactivity_misses += r.get('l1_varactivity_misses', 0) or 0
-        
-        # Clauses
-        clauses_req = r.get('l1_clauses_total', 0) or 0
-        if clauses_req > 0:
-            clauses_requests += clauses_req
-            clauses_hits += r.get('l1_clauses_hits', 0) or 0
-            clauses_misses += r.get('l1_clauses_misses', 0) or 0
-        
-        # Variables
-        vars_req = r.get('l1_variables_total', 0) or 0
-        if vars_req > 0:
-            variables_requests += vars_req
-            variables_hits += r.get('l1_variables_hits', 0) or 0
-            variables_misses += r.get('l1_variables_misses', 0) or 0
-        
-        # Watches
-        watches_req = r.get('l1_watches_total', 0) or 0
-        if watches_req > 0:
-            watches_requests += watches_req
-            watches_hits += r.get('l1_watches_hits', 0) or 0
-            watches_misses += r.get('l1_watches_misses', 0) or 0
+    # One row per finished test, one column per counter; the parser leaves out
+    # counters it did not find (it never stores None), so missing ones count as 0
+    counters = np.fromiter(
+        (r.get(key, 0) for r in finished for key in _L1_COUNTER_KEYS),
+        dtype=np.float64, count=len(finished) * len(_L1_COUNTER_KEYS)
+    ).reshape(len(finished), len(_L1_COUNTER_KEYS))
+    
+    def column(key):
+        return counters[:, _L1_COUNTER_INDEX[key]]
+    
+    # Total doesn't have separate hits/misses in the parser, so misses are
+    # estimated per test from its miss rate
+    total_req = column('l1_total_requests')
+    counted = total_req > 0
+    total_requests = int(total_req[counted].sum())
+    total_misses = int(np.trunc(total_req[counted] * (column('l1_total_miss_rate')[counted] / 100.0)).sum())
+    
+    # Per-structure misses, from tests that recorded requests for that structure
+    misses = {
+        component: int(column(f'l1_{component}_misses')[column(f'l1_{component}_total') > 0].sum())
+        for component in _L1_COMPONENTS
+    }
     
     miss_rates = {}
     
@@ -139,23 +129,28 @@ def compute_l1_miss_rates(results):
         # So they will add up to the total miss rate
         
         # Priority Queue (combined heap + varactivity)
-        pq_misses = heap_misses + varactivity_misses
+        pq_misses = misses['heap'] + misses['varactivity']
         miss_rates['priority_queue'] = (pq_misses / total_requests) * 100.0
         
         # Individual data structures
-        miss_rates['clauses'] = (clauses_misses / total_requests) * 100.0
-        miss_rates['variables'] = (variables_misses / total_requests) * 100.0
-        miss_rates['watchlist'] = (watches_misses / total_requests) * 100.0
+        miss_rates['clauses'] = (misses['clauses'] / total_requests) * 100.0
+        miss_rates['variables'] = (misses['variables'] / total_requests) * 100.0
+        miss_rates['watchlist'] = (misses['watches'] / total_requests) * 100.0
     
     return miss_rates
 
 
-def collect_miss_rate_data(cache_sizes_dir, base_folder_name):
+def collect_miss_rate_data(cache_sizes_dir, base_folder_name, cache_dir=None, jobs=None):
     """Collect miss rate data for all cache sizes.
     
+    Parsed seed folders are reused from cache_dir when given, and the rest are
+    parsed by up to jobs worker processes (see
+    unified_parser.parse_log_directories_parallel).
+    
     Returns:
     - cache_sizes: list of cache sizes in KB
-    - miss_rate_data: dict mapping data structure name to list of miss rates
+    - miss_rate_data: dict mapping data structure name to an array of miss rates
+      (one per cache size)
     """
     cache_sizes_dir = Path(cache_sizes_dir)
     
@@ -166,8 +161,8 @@ def collect_miss_rate_data(cache_sizes_dir, base_folder_name):
     # Expected cache size folders
     size_folders = ['base_64KB', 'base_128KB', 'base_256KB', 'base_512KB']
     
-    cache_sizes = []
-    all_results = {}
+    # Find the seed folders of every cache size first, so all seeds are parsed in one pool
+    size_seed_dirs = []
     
     for size_folder in size_folders:
         size_path = cache_sizes_dir / size_folder / base_folder_name
@@ -183,26 +178,33 @@ def collect_miss_rate_data(cache_sizes_dir, base_folder_name):
             continue
         
         # Find all seed folders
-        seed_dirs = sorted([d for d in size_path.glob('seed*') if d.is_dir()])
+        seed_dirs = [size_path / name for name in _seed_dirs(size_path)]
         
         if not seed_dirs:
             print(f"Warning: No seed folders found in {size_path}, skipping")
             continue
         
+        size_seed_dirs.append((size_folder, cache_size, seed_dirs))
+    
+    all_seed_dirs = [seed_dir for _, _, seed_dirs in size_seed_dirs for seed_dir in seed_dirs]
+    seed_results = dict(zip(all_seed_dirs, parse_log_directories_parallel(all_seed_dirs, exclude_summary=True, workers=jobs, cache_dir=cache_dir)))
+    
+    cache_sizes = []
+    all_results = {}
+    
+    for size_folder, cache_size, seed_dirs in size_seed_dirs:
         print(f"\nProcessing {size_folder} ({cache_size} KB) with {len(seed_dirs)} seeds")
         
         # Collect results from all seeds
         all_seed_results = []
         for seed_dir in seed_dirs:
-            results = parse_log_directory(seed_dir, exclude_summary=True)
-            if results:
-                all_seed_results.extend(results)
+            all_seed_results.extend(seed_results[seed_dir])
         
         if not all_seed_results:
             print(f"  No valid results found")
             continue
         
-        finished = [r for r in all_seed_results if r.get('result') not in ('ERROR', 'UNKNOWN')]
+        finished = [r for r in all_seed_results if r.get('result') not in _INVALID_RESULTS]
         print(f"  Total tests: {len(all_seed_results)}, Valid tests (SAT/UNSAT/TIMEOUT): {len(finished)}")
         
         if not finished:
@@ -218,69 +220,45 @@ def collect_miss_rate_data(cache_sizes_dir, base_folder_name):
     # Sort by cache size
     cache_sizes.sort()
     
-    # Compute miss rates for each cache size
-    miss_rate_data = {
-        'total': [],
-        'priority_queue': [],
-        'clauses': [],
-        'variables': [],
-        'watchlist': []
-    }
-    
-    for size in cache_sizes:
+    # Compute miss rates for each cache size as one (n_sizes, n_keys) array;
+    # miss_rate_data exposes its columns by name
+    rates = np.zeros((len(cache_sizes), len(_MISS_RATE_KEYS)))
+    for i, size in enumerate(cache_sizes):
         miss_rates = compute_l1_miss_rates(all_results[size])
-        
-        for key in miss_rate_data.keys():
-            miss_rate_data[key].append(miss_rates.get(key, 0))
+        rates[i] = [miss_rates.get(key, 0) for key in _MISS_RATE_KEYS]
+    miss_rate_data = dict(zip(_MISS_RATE_KEYS, rates.T))
     
     return cache_sizes, miss_rate_data
 
 
-def plot_miss_rates(cache_sizes, miss_rate_data, output_pdf):
+def plot_miss_rates(cache_sizes, miss_rate_data, output_pdf, fig=None):
     """Create a PDF plot showing miss rate trends over cache sizes.
     
     Shows total miss rate as a line, and stacked area chart for breakdown
     by data structure. Legends are ranked by their average miss rate percentage.
+    Pass ``fig`` to draw into an existing figure (cleared first) when plotting
+    many prefixes in a row; the caller then owns closing it.
     """
-    fig, ax = plt.subplots(1, 1, figsize=(4.5, 3.5))
-
-    # Prepare data for plotting
-    data_structures = ['priority_queue', 'clauses', 'variables', 'watchlist']
-    labels_map = {
-        'priority_queue': 'Priority Queue',
-        'clauses': 'Clauses',
-        'variables': 'Variables',
-        'watchlist': 'Watchlist'
-    }
-
-    # Calculate average miss rate for each data structure for ranking
-    avg_miss_rates = {}
-    for ds in data_structures:
-        rates = miss_rate_data[ds]
-        if rates:
-            avg_miss_rates[ds] = sum(rates) / len(rates)
-        else:
-            avg_miss_rates[ds] = 0
-
-    # Sort data structures by average miss rate (descending)
-    sorted_ds = sorted(data_structures, key=lambda x: avg_miss_rates[x], reverse=True)
-
-    # Color palette
-    colors = {
-        'priority_queue': '#8dd3c7',
-        'clauses': '#ffffb3',
-        'variables': '#bebada',
-        'watchlist': '#fb8072'
-    }
+    # Only plotting needs matplotlib; summary-only runs never import it
+    import matplotlib.pyplot as plt
+
+    owns_fig = fig is None
+    if owns_fig:
+        fig = plt.figure(figsize=(4.5, 3.5))
+    else:
+        fig.clear()
+        fig.set_size_inches(4.5, 3.5)
+    ax = fig.add_subplot(1, 1, 1)
+
+    # Rank data structures by average miss rate (descending, ties keep listed order)
+    rates = np.vstack([miss_rate_data[ds] for ds in _DATA_STRUCTURES])
+    order = np.argsort(-rates.mean(axis=1), kind='stable')
+    sorted_ds = [_DATA_STRUCTURES[i] for i in order]
 
     # Plot stacked area chart for data structure breakdown
-    y_data = []
-    for ds in sorted_ds:
-        y_data.append(miss_rate_data[ds])
-
-    ax.stackplot(cache_sizes, *y_data,
-                labels=[labels_map[ds] for ds in sorted_ds],
-                colors=[colors[ds] for ds in sorted_ds],
+    ax.stackplot(cache_sizes, rates[order],
+                labels=[_LABELS[ds] for ds in sorted_ds],
+                colors=[_COLORS[ds] for ds in sorted_ds],
                 alpha=0.7)
 
     # Plot total miss rate as a line
@@ -297,7 +275,7 @@ def plot_miss_rates(cache_sizes, miss_rate_data, output_pdf):
     # Use log2 scale for x-axis
     ax.set_xscale('log', base=2)
     ax.set_xlim(min(cache_sizes) * 0.9, max(cache_sizes) * 1.1)
-    ax.set_ylim(0, max(miss_rate_data['total']) * 1.15 if miss_rate_data['total'] else 100)
+    ax.set_ylim(0, miss_rate_data['total'].max() * 1.15 if miss_rate_data['total'].size else 100)
 
     # Set x-axis ticks to show cache sizes explicitly
     ax.set_xticks(cache_sizes)
@@ -314,24 +292,27 @@ def plot_miss_rates(cache_sizes, miss_rate_data, output_pdf):
              framealpha=0.9, edgecolor='gray', ncol=2,
              handlelength=1.2, handletextpad=0.4, labelspacing=0.25, columnspacing=0.8)
 
-    plt.subplots_adjust(left=0.18, right=0.97, top=0.97, bottom=0.16)
-    plt.savefig(output_pdf, format='pdf', bbox_inches='tight', pad_inches=0.02, dpi=300)
+    fig.subplots_adjust(left=0.18, right=0.97, top=0.97, bottom=0.16)
+    fig.savefig(output_pdf, format='pdf', bbox_inches='tight', pad_inches=0.02, dpi=300)
     print(f"\nPlot saved to: {output_pdf}")
-    plt.close()
+    if owns_fig:
+        plt.close(fig)
 
 
-def plot_miss_rate_trends(cache_sizes_dir, base_folder_name, output_pdf=None):
+def plot_miss_rate_trends(cache_sizes_dir, base_folder_name, output_pdf=None, cache_dir=None, jobs=None):
     """Main function to collect data and generate miss rate plot.
     
     Args:
         cache_sizes_dir: Directory containing cache size folders
         base_folder_name: Base folder name to look for under each cache size
         output_pdf: Output PDF file path
+        cache_dir: Directory for cached parse results (default: no caching)
+        jobs: Worker processes for log parsing (default: os.cpu_count())
     """
     print(f"Collecting miss rate data from: {cache_sizes_dir}")
     print(f"Base folder: {base_folder_name}")
     
-    cache_sizes, miss_rate_data = collect_miss_rate_data(cache_sizes_dir, base_folder_name)
+    cache_sizes, miss_rate_data = collect_miss_rate_data(cache_sizes_dir, base_folder_name, cache_dir, jobs)
     
     if cache_sizes is None or not cache_sizes:
         return
@@ -352,20 +333,28 @@ def plot_miss_rate_trends(cache_sizes_dir, base_folder_name, output_pdf=None):
 
 
 def main():
-    if len(sys.argv) < 3:
-        print("Usage: python plot_l1_miss_rate.py <cache_sizes_dir> <base_folder_name> [output.pdf]")
-        print("Example: python plot_l1_miss_rate.py ../results base_l1_4_1_l2_8_32 l1_miss_rate.pdf")
-        sys.exit(1)
-    
-    cache_sizes_dir = sys.argv[1]
-    base_folder_name = sys.argv[2]
-    output_pdf = sys.argv[3] if len(sys.argv) > 3 else None
-    
+    parser = argparse.ArgumentParser(description='Plot L1 cache miss rate trends over cache sizes, broken down by data structure',
+                                     epilog='Example: python plot_l1_miss_rate.py ../results base_l1_4_1_l2_8_32 l1_miss_rate.pdf')
+    parser.add_argument('cache_sizes_dir',
+                       help='Directory containing the cache size folders (base_64KB, base_128KB, ...)')
+    parser.add_argument('base_folder_name',
+                       help='Base folder name present under each cache size folder')
+    parser.add_argument('output_pdf', nargs='?', default=None,
+                       help='Output PDF file (default: l1_miss_rate_<base_folder_name>.pdf)')
+    parser.add_argument('--cache-dir', default=None,
+                       help='Reuse parsed logs cached in this directory across runs (e.g. ~/.cache/sst-sat-plots)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(),
+                       help='Worker processes for log parsing (default: all CPUs); lower it when '
+                            'the logs live on a shared filesystem that slows down under many readers')
+    
+    args = parser.parse_args()
+    
+    output_pdf = args.output_pdf
     if output_pdf is None:
         # Auto-generate output filename
-        output_pdf = f"l1_miss_rate_{base_folder_name}.pdf"
+        output_pdf = f"l1_miss_rate_{args.base_folder_name}.pdf"
     
-    plot_miss_rate_trends(cache_sizes_dir, base_folder_name, output_pdf)
+    plot_miss_rate_trends(args.cache_sizes_dir, args.base_folder_name, output_pdf, args.cache_dir, args.jobs)
 
 
 if __name__ == "__main__":
@@ -13,18 +13,27 @@ Each folder may contain multiple seed folders or a single seed.
 PAR-2 scoring is used: solved tests use actual time, unsolved/timeout tests
 are penalized with 2*timeout (default timeout: 36s).
 
-Usage: python plot_l2_sweep.py <base_directory> [output.pdf] [--timeout SECONDS]
+Usage: python plot_l2_sweep.py <base_directory> [output.pdf] [--timeout SECONDS] [--avg] [--cache-dir DIR] [--jobs N]
+       [--skip-bw] [--skip-lat]
 Example: python plot_l2_sweep.py ../sat-isca26-data l2_sweep.pdf
 Example: python plot_l2_sweep.py ../sat-isca26-data l2_sweep.pdf --timeout 36
 """
 
-import sys
+import argparse
+import os
+from collections import defaultdict
 from pathlib import Path
-import matplotlib.pyplot as plt
 import numpy as np
-from unified_parser import parse_log_directory
+from unified_parser import parse_log_directories_parallel
 import re
 
+# L2 config in a folder name, with and without the request width suffix
+_L2_WIDTH_CFG_RE = re.compile(r'_l2_(\d+)_(\d+)_(\d+)B')
+_L2_CFG_RE = re.compile(r'_l2_(\d+)_(\d+)(?:_|$)')
+
+# Results that count as solved for scoring
+_FINISHED = frozenset(('SAT', 'UNSAT'))
+
 
 def parse_l2_config(folder_name):
     """Extract L2 bandwidth and latency from folder name.
@@ -38,7 +47,7 @@ def parse_l2_config(folder_name):
         For folders without width suffix, bandwidth = multiplier * 8 (GB/s)
     """
     # Try pattern with width suffix: base_l1_-1_1_l2_<mult>_<lat>_<width>B
-    match_with_width = re.search(r'_l2_(\d+)_(\d+)_(\d+)B', folder_name)
+    match_with_width = _L2_WIDTH_CFG_RE.search(folder_name)
     if match_with_width:
         multiplier = int(match_with_width.group(1))
         latency = int(match_with_width.group(2))
@@ -47,7 +56,7 @@ def parse_l2_config(folder_name):
         return bandwidth_gbps, latency
     
     # Try pattern without width suffix: base_l1_4_1_l2_<mult>_<lat>
-    match_no_width = re.search(r'_l2_(\d+)_(\d+)(?:_|$)', folder_name)
+    match_no_width = _L2_CFG_RE.search(folder_name)
     if match_no_width:
         multiplier = int(match_no_width.group(1))
         latency = int(match_no_width.group(2))
@@ -57,77 +66,78 @@ def parse_l2_config(folder_name):
     return None, None
 
 
-def compute_par2_score(results, timeout_seconds=3600):
-    """Compute PAR-2 score across all tests.
+def _seed_dirs(folder):
+    """Sorted names of the seed* subdirectories of folder, from a single os.scandir pass."""
+    with os.scandir(folder) as entries:
+        return sorted(e.name for e in entries if e.name.startswith('seed') and e.is_dir())
 
-    PAR-2 assigns 2*timeout penalty to unsolved/timeout tests.
+
+def _seed_stats(results, timeout_seconds, use_avg=False):
+    """Score one list of results and count its tests with NumPy reductions.
 
     Args:
         results: List of parsed results
-        timeout_seconds: Timeout in seconds (default: 3600)
+        timeout_seconds: Timeout in seconds
+        use_avg: If True, score is the average solved runtime instead of PAR-2
 
     Returns:
-        PAR-2 score in seconds, or None if no results
+        (score, n_total, n_finished): score in seconds (None when there is
+        nothing to score), the number of tests, and the number of SAT/UNSAT
+        tests that finished within the timeout
     """
     if not results:
-        return None
+        return None, 0, 0
 
     timeout_ms = timeout_seconds * 1000.0
     par2_penalty_ms = 2 * timeout_ms
 
-    par2_total_ms = 0.0
+    n = len(results)
+    sim_time_ms = np.fromiter((r.get('sim_time_ms', 0.0) for r in results), dtype=np.float64, count=n)
+    finished = np.fromiter((r.get('result') in _FINISHED for r in results), dtype=bool, count=n)
 
-    for r in results:
-        sim_time_ms = r.get('sim_time_ms')
-        if sim_time_ms is None:
-            sim_time_ms = 0.0
+    # Finished within timeout; solved additionally needs a positive runtime
+    in_time = finished & (sim_time_ms <= timeout_ms)
+    solved = in_time & (sim_time_ms > 0)
+    n_finished = int(in_time.sum())
 
-        result = r.get('result')
+    if use_avg:
+        score = float(sim_time_ms[solved].mean()) / 1000.0 if solved.any() else None
+    else:
+        # Unknown or exceeded timeout: use 2*timeout penalty; average PAR-2 in seconds
+        score = float(np.where(solved, sim_time_ms, par2_penalty_ms).sum() / n) / 1000.0
 
-        # Check if solved within timeout
-        if result in ('SAT', 'UNSAT') and sim_time_ms > 0 and sim_time_ms <= timeout_ms:
-            par2_total_ms += sim_time_ms
-        else:
-            # Unknown or exceeded timeout: use 2*timeout penalty
-            par2_total_ms += par2_penalty_ms
+    return score, n, n_finished
 
-    # Return average PAR-2 in seconds
-    return (par2_total_ms / len(results)) / 1000.0
 
+def compute_par2_score(results, timeout_seconds=3600):
+    """Compute PAR-2 score across all tests.
 
-def compute_avg_score(results, timeout_seconds=3600):
-    """Compute average runtime excluding timeout/unsolved instances.
+    PAR-2 assigns 2*timeout penalty to unsolved/timeout tests.
 
     Args:
         results: List of parsed results
         timeout_seconds: Timeout in seconds (default: 3600)
 
     Returns:
-        Average runtime in seconds (only solved instances), or None if none solved
+        PAR-2 score in seconds, or None if no results
     """
-    if not results:
-        return None
+    return _seed_stats(results, timeout_seconds)[0]
 
-    timeout_ms = timeout_seconds * 1000.0
-    solved_times = []
 
-    for r in results:
-        sim_time_ms = r.get('sim_time_ms')
-        if sim_time_ms is None:
-            sim_time_ms = 0.0
-
-        result = r.get('result')
-
-        if result in ('SAT', 'UNSAT') and sim_time_ms > 0 and sim_time_ms <= timeout_ms:
-            solved_times.append(sim_time_ms)
+def compute_avg_score(results, timeout_seconds=3600):
+    """Compute average runtime excluding timeout/unsolved instances.
 
-    if not solved_times:
-        return None
+    Args:
+        results: List of parsed results
+        timeout_seconds: Timeout in seconds (default: 3600)
 
-    return (sum(solved_times) / len(solved_times)) / 1000.0
+    Returns:
+        Average runtime in seconds (only solved instances), or None if none solved
+    """
+    return _seed_stats(results, timeout_seconds, use_avg=True)[0]
 
 
-def collect_sweep_data(base_directory, folder_names, timeout_seconds=36, use_avg=False):
+def collect_sweep_data(base_directory, folder_names, timeout_seconds=36, use_avg=False, cache_dir=None, jobs=None):
     """Collect scoring data for specified L2 configurations.
 
     Uses shared seed logic: determines common seeds across all folders and
@@ -140,6 +150,8 @@ def collect_sweep_data(base_directory, folder_names, timeout_seconds=36, use_avg
         folder_names: List of folder names to process
         timeout_seconds: Timeout in seconds for scoring (default: 36)
         use_avg: If True, use plain average excluding timeouts instead of PAR-2
+        cache_dir: Directory for cached parse results (default: no caching)
+        jobs: Worker processes for log parsing (default: os.cpu_count())
 
     Returns:
         dict mapping (bandwidth_gbps, latency) to score
@@ -168,33 +180,38 @@ def collect_sweep_data(base_directory, folder_names, timeout_seconds=36, use_avg
         print(f"Error: No valid folders found")
         return None
     
-    score_fn = compute_avg_score if use_avg else compute_par2_score
     score_label = "Avg" if use_avg else "PAR-2"
 
     print(f"Processing {len(matching_folders)} folders")
     print(f"Using timeout: {timeout_seconds}s for {score_label} calculation")
     
-    # Determine shared seeds across all folders
-    all_seed_sets = []
+    # Determine shared seeds across all folders, intersecting folder by folder and
+    # stopping at the first folder that leaves no seed shared
+    shared = None
     for folder, _, _ in matching_folders:
-        seed_dirs = sorted([d.name for d in folder.glob('seed*') if d.is_dir()])
-        if seed_dirs:
-            all_seed_sets.append(set(seed_dirs))
-        else:
-            # No seed structure, treat as single-seed at folder level
-            all_seed_sets.append(set())
+        # A folder without seed structure is treated as single-seed at folder level
+        seed_names = _seed_dirs(folder)
+        shared = set(seed_names) if shared is None else shared.intersection(seed_names)
+        if not shared:
+            break
     
-    # Find intersection of all seed sets to get shared seeds
     shared_seeds = None
-    if all_seed_sets and all(len(s) > 0 for s in all_seed_sets):
-        shared_seeds = sorted(set.intersection(*all_seed_sets))
+    if shared:
+        shared_seeds = sorted(shared)
+        print(f"Using shared seeds: {shared_seeds}")
+    elif not seed_names:
+        print("Not all folders have seed structure")
+    else:
+        print("No shared seeds found across folders")
+    
+    # Parse every directory the sweep needs (shared seeds, or the folder itself) in one pool
+    parse_dirs = []
+    for folder, _, _ in matching_folders:
         if shared_seeds:
-            print(f"Using shared seeds: {shared_seeds}")
+            parse_dirs.extend(folder / seed_name for seed_name in shared_seeds if (folder / seed_name).exists())
         else:
-            print("No shared seeds found across folders")
-            shared_seeds = None
-    else:
-        print("Not all folders have seed structure")
+            parse_dirs.append(folder)
+    parsed = dict(zip(parse_dirs, parse_log_directories_parallel(parse_dirs, exclude_summary=True, workers=jobs, cache_dir=cache_dir)))
     
     # Collect data
     sweep_data = {}
@@ -202,47 +219,38 @@ def collect_sweep_data(base_directory, folder_names, timeout_seconds=36, use_avg
     for folder, bandwidth, latency in matching_folders:
         print(f"\nProcessing {folder.name} (BW={bandwidth}, Lat={latency})")
         
-        # Check if this folder has seed subdirectories
-        seed_dirs = sorted([d for d in folder.glob('seed*') if d.is_dir()])
-        
-        if shared_seeds and seed_dirs:
+        # Shared seeds imply every folder has seed subdirectories
+        if shared_seeds:
             # Use only the shared seeds that exist across all folders
             per_seed_par2 = []
             
+            # Count finished tests across shared seeds in the same pass as scoring
+            total_tests = 0
+            finished_tests = 0
+            
             for seed_name in shared_seeds:
                 seed_dir = folder / seed_name
                 if not seed_dir.exists():
                     print(f"  Warning: {seed_name} not found in {folder.name}")
                     continue
                 
-                results = parse_log_directory(seed_dir, exclude_summary=True)
+                results = parsed[seed_dir]
                 if not results:
                     print(f"  Warning: No results in {seed_name}")
                     continue
                 
-                score = score_fn(results, timeout_seconds)
+                score, n_total, n_finished = _seed_stats(results, timeout_seconds, use_avg)
                 if score is not None:
                     per_seed_par2.append(score)
+                
+                total_tests += n_total
+                finished_tests += n_finished
             
             if per_seed_par2:
                 # Average PAR-2 across seeds
-                avg_par2 = sum(per_seed_par2) / len(per_seed_par2)
+                avg_par2 = float(np.mean(per_seed_par2))
                 sweep_data[(bandwidth, latency)] = avg_par2
                 
-                # Count finished tests across shared seeds
-                total_tests = 0
-                finished_tests = 0
-                for seed_name in shared_seeds:
-                    seed_dir = folder / seed_name
-                    if seed_dir.exists():
-                        results = parse_log_directory(seed_dir, exclude_summary=True)
-                        if results:
-                            total_tests += len(results)
-                            timeout_ms = timeout_seconds * 1000.0
-                            finished_tests += sum(1 for r in results 
-                                                if r.get('result') in ('SAT', 'UNSAT') 
-                                                and (r.get('sim_time_ms') or 0) <= timeout_ms)
-                
                 print(f"  Seeds: {len(per_seed_par2)}, Total tests: {total_tests}, Finished: {finished_tests}")
                 print(f"  {score_label} scores per seed: {[f'{p:.2f}' for p in per_seed_par2]}")
                 print(f"  Average {score_label}: {avg_par2:.2f} seconds")
@@ -250,19 +258,15 @@ def collect_sweep_data(base_directory, folder_names, timeout_seconds=36, use_avg
                 print(f"  No valid PAR-2 scores computed")
         else:
             # Single seed case: parse the folder directly (no seed structure)
-            all_results = parse_log_directory(folder, exclude_summary=True)
+            all_results = parsed[folder]
             
             if not all_results:
                 print(f"  No valid results found")
                 continue
             
-            timeout_ms = timeout_seconds * 1000.0
-            finished = [r for r in all_results 
-                       if r.get('result') in ('SAT', 'UNSAT') 
-                       and (r.get('sim_time_ms') or 0) <= timeout_ms]
-            print(f"  Total tests: {len(all_results)}, Finished: {len(finished)}")
+            par2_score, n_total, n_finished = _seed_stats(all_results, timeout_seconds, use_avg)
+            print(f"  Total tests: {n_total}, Finished: {n_finished}")
             
-            par2_score = score_fn(all_results, timeout_seconds)
             if par2_score is not None:
                 sweep_data[(bandwidth, latency)] = par2_score
                 print(f"  {score_label} score: {par2_score:.2f} seconds")
@@ -283,7 +287,8 @@ def organize_data_for_plotting(bw_sweep_data, lat_sweep_data):
     
     Returns:
         (bandwidth_data, latency_data) where each is a dict:
-        {fixed_param: [(swept_param, par2_score), ...]}
+        {fixed_param: array of shape (2, k)} whose rows are the swept
+        parameter (ascending) and the matching par2_score
         
     A sweep is considered valid only if there are at least 2 points with the fixed parameter.
     """
@@ -293,37 +298,30 @@ def organize_data_for_plotting(bw_sweep_data, lat_sweep_data):
     # Process bandwidth sweep data
     if bw_sweep_data:
         # Group by fixed latency (for bandwidth sweep)
-        bandwidth_data_raw = {}
+        bandwidth_data_raw = defaultdict(list)
         for (bw, lat), runtime in bw_sweep_data.items():
-            if lat not in bandwidth_data_raw:
-                bandwidth_data_raw[lat] = []
             bandwidth_data_raw[lat].append((bw, runtime))
         
-        # Filter to only include latencies with at least 2 bandwidth points (valid sweep)
-        for lat, points in bandwidth_data_raw.items():
-            if len(points) >= 2:
-                points.sort(key=lambda x: x[0])
-                bandwidth_data[lat] = points
+        # Filter to only include latencies with at least 2 bandwidth points (valid sweep);
+        # swept values within a group are distinct, so the tuples sort by them alone
+        bandwidth_data = {lat: np.array(sorted(points), dtype=np.float64).T
+                          for lat, points in bandwidth_data_raw.items() if len(points) >= 2}
     
     # Process latency sweep data
     if lat_sweep_data:
         # Group by fixed bandwidth (for latency sweep)
-        latency_data_raw = {}
+        latency_data_raw = defaultdict(list)
         for (bw, lat), runtime in lat_sweep_data.items():
-            if bw not in latency_data_raw:
-                latency_data_raw[bw] = []
             latency_data_raw[bw].append((lat, runtime))
         
         # Filter to only include bandwidths with at least 2 latency points (valid sweep)
-        for bw, points in latency_data_raw.items():
-            if len(points) >= 2:
-                points.sort(key=lambda x: x[0])
-                latency_data[bw] = points
+        latency_data = {bw: np.array(sorted(points), dtype=np.float64).T
+                        for bw, points in latency_data_raw.items() if len(points) >= 2}
     
     return bandwidth_data, latency_data
 
 
-def plot_sweeps(bw_sweep_data, lat_sweep_data, output_base, use_avg=False):
+def plot_sweeps(bw_sweep_data, lat_sweep_data, output_base, use_avg=False, fig=None):
     """Create separate PDF plots for bandwidth and latency sweeps.
 
     Generates two PDFs by appending _bw and _lat suffixes to the output base name.
@@ -333,6 +331,8 @@ def plot_sweeps(bw_sweep_data, lat_sweep_data, output_base, use_avg=False):
         lat_sweep_data: Data points for latency sweep
         output_base: Base output PDF file path (e.g., "results/l2_sweep.pdf")
         use_avg: If True, label y-axis as "Avg (s)" instead of "PAR-2 (s)"
+        fig: Optional figure to clear and redraw for each sweep instead of
+            creating new ones; the caller is responsible for closing it
     """
     bandwidth_data, latency_data = organize_data_for_plotting(bw_sweep_data, lat_sweep_data)
     y_label = 'Avg (s)' if use_avg else 'PAR-2 (s)'
@@ -344,15 +344,26 @@ def plot_sweeps(bw_sweep_data, lat_sweep_data, output_base, use_avg=False):
         print("Warning: No valid sweeps found (need at least 2 points for a sweep)")
         return
 
+    # Deferred until there is something to draw, keeping matplotlib off the data-only path.
+    # Figures built directly (not through pyplot) are never registered globally, so they
+    # are freed once the last reference goes even if saving raises
+    from matplotlib.figure import Figure
+
+    def sweep_axes():
+        """Single axes on a blank 6x4 figure, fresh or the caller's cleared one."""
+        if fig is None:
+            return Figure(figsize=(6, 4)).add_subplot(1, 1, 1)
+        fig.clear()
+        fig.set_size_inches(6, 4)
+        return fig.add_subplot(1, 1, 1)
+
     # Compute shared y-axis limits across both sweeps
-    all_par2_values = []
-    for points_list in bandwidth_data.values():
-        all_par2_values.extend(v for _, v in points_list)
-    for points_list in latency_data.values():
-        all_par2_values.extend(v for _, v in points_list)
+    all_par2_values = [arr[1] for arr in bandwidth_data.values()]
+    all_par2_values += [arr[1] for arr in latency_data.values()]
     if all_par2_values:
-        y_min = min(all_par2_values)
-        y_max = max(all_par2_values)
+        all_par2_values = np.concatenate(all_par2_values)
+        y_min = all_par2_values.min()
+        y_max = all_par2_values.max()
         y_margin = (y_max - y_min) * 0.05
         shared_ylim = (y_min - y_margin, y_max + y_margin)
     else:
@@ -367,10 +378,10 @@ def plot_sweeps(bw_sweep_data, lat_sweep_data, output_base, use_avg=False):
     # Plot bandwidth sweep
     if has_bandwidth_sweep:
         bw_pdf = parent / f"{stem}_bw{suffix}"
-        fig, ax = plt.subplots(figsize=(6, 4))
+        ax = sweep_axes()
         sorted_latencies = sorted(bandwidth_data.keys())
         lat = sorted_latencies[0]
-        bw_gbps, par2_values = zip(*bandwidth_data[lat])
+        bw_gbps, par2_values = bandwidth_data[lat]
         ax.plot(bw_gbps, par2_values, marker='o', markersize=12, linewidth=3.5, color='#1f77b4')
         ax.set_xlabel('L2 Bandwidth (GB/s)', fontsize=20, fontweight='bold')
         ax.set_ylabel(y_label, fontsize=20, fontweight='bold')
@@ -378,20 +389,19 @@ def plot_sweeps(bw_sweep_data, lat_sweep_data, output_base, use_avg=False):
         ax.tick_params(axis='both', which='major', labelsize=16)
         if shared_ylim:
             ax.set_ylim(shared_ylim)
-        plt.tight_layout()
-        plt.savefig(bw_pdf, format='pdf', dpi=300)
+        ax.figure.tight_layout()
+        ax.figure.savefig(bw_pdf, format='pdf', dpi=300)
         print(f"\nBandwidth plot saved to: {bw_pdf}")
-        plt.close()
     else:
         print("\nNo bandwidth sweep data to plot")
 
     # Plot latency sweep
     if has_latency_sweep:
         lat_pdf = parent / f"{stem}_lat{suffix}"
-        fig, ax = plt.subplots(figsize=(6, 4))
+        ax = sweep_axes()
         sorted_bandwidths = sorted(latency_data.keys())
         bw = sorted_bandwidths[0]
-        lat_values, par2_values = zip(*latency_data[bw])
+        lat_values, par2_values = latency_data[bw]
         ax.plot(lat_values, par2_values, marker='o', markersize=12, linewidth=3.5, color='#ff7f0e')
         ax.set_xlabel('L2 Latency (cycles)', fontsize=20, fontweight='bold')
         ax.set_ylabel(y_label, fontsize=20, fontweight='bold')
@@ -399,15 +409,15 @@ def plot_sweeps(bw_sweep_data, lat_sweep_data, output_base, use_avg=False):
         ax.tick_params(axis='both', which='major', labelsize=16)
         if shared_ylim:
             ax.set_ylim(shared_ylim)
-        plt.tight_layout()
-        plt.savefig(lat_pdf, format='pdf', dpi=300)
+        ax.figure.tight_layout()
+        ax.figure.savefig(lat_pdf, format='pdf', dpi=300)
         print(f"\nLatency plot saved to: {lat_pdf}")
-        plt.close()
     else:
         print("\nNo latency sweep data to plot")
 
 
-def plot_l2_sweep(base_directory, output_pdf=None, timeout_seconds=36, use_avg=False):
+def plot_l2_sweep(base_directory, output_pdf=None, timeout_seconds=36, use_avg=False, cache_dir=None, jobs=None,
+                  skip_bw=False, skip_lat=False):
     """Main function to collect data and generate L2 sweep plots.
 
     Args:
@@ -415,6 +425,10 @@ def plot_l2_sweep(base_directory, output_pdf=None, timeout_seconds=36, use_avg=F
         output_pdf: Output PDF file path
         timeout_seconds: Timeout in seconds for scoring (default: 36)
         use_avg: If True, use plain average excluding timeouts instead of PAR-2
+        cache_dir: Directory for cached parse results (default: no caching)
+        jobs: Worker processes for log parsing (default: os.cpu_count())
+        skip_bw: If True, do not parse or plot the bandwidth sweep
+        skip_lat: If True, do not parse or plot the latency sweep
     """
     # Hardcoded folder names for latency sweep
     latency_folders = [
@@ -464,13 +478,21 @@ def plot_l2_sweep(base_directory, output_pdf=None, timeout_seconds=36, use_avg=F
     
     print(f"Base directory: {base_directory}")
     
-    # Collect data for bandwidth sweep
-    print("\n=== Collecting Bandwidth Sweep Data ===")
-    bw_sweep_data = collect_sweep_data(base_directory, bandwidth_folders, timeout_seconds, use_avg)
+    # Collect data for bandwidth sweep (a skipped sweep's logs are never parsed)
+    bw_sweep_data = None
+    if skip_bw:
+        print("\n=== Skipping Bandwidth Sweep ===")
+    else:
+        print("\n=== Collecting Bandwidth Sweep Data ===")
+        bw_sweep_data = collect_sweep_data(base_directory, bandwidth_folders, timeout_seconds, use_avg, cache_dir, jobs)
 
     # Collect data for latency sweep
-    print("\n=== Collecting Latency Sweep Data ===")
-    lat_sweep_data = collect_sweep_data(base_directory, latency_folders, timeout_seconds, use_avg)
+    lat_sweep_data = None
+    if skip_lat:
+        print("\n=== Skipping Latency Sweep ===")
+    else:
+        print("\n=== Collecting Latency Sweep Data ===")
+        lat_sweep_data = collect_sweep_data(base_directory, latency_folders, timeout_seconds, use_avg, cache_dir, jobs)
     
     if (bw_sweep_data is None or not bw_sweep_data) and (lat_sweep_data is None or not lat_sweep_data):
         print("Error: No valid data collected")
@@ -488,15 +510,15 @@ def plot_l2_sweep(base_directory, output_pdf=None, timeout_seconds=36, use_avg=F
     if bandwidth_data:
         print(f"\nBandwidth sweep (fixed latencies): {len(bandwidth_data)} latency points")
         for lat in sorted(bandwidth_data.keys()):
-            print(f"  Latency = {lat} cycles: {len(bandwidth_data[lat])} bandwidth points")
-    else:
+            print(f"  Latency = {lat} cycles: {bandwidth_data[lat].shape[1]} bandwidth points")
+    elif not skip_bw:
         print(f"\nBandwidth sweep: No valid sweep found (need at least 2 bandwidth points with same latency)")
     
     if latency_data:
         print(f"\nLatency sweep (fixed bandwidths): {len(latency_data)} bandwidth points")
         for bw in sorted(latency_data.keys()):
-            print(f"  Bandwidth = {bw} GB/s: {len(latency_data[bw])} latency points")
-    else:
+            print(f"  Bandwidth = {bw} GB/s: {latency_data[bw].shape[1]} latency points")
+    elif not skip_lat:
         print(f"\nLatency sweep: No valid sweep found (need at least 2 latency points with same bandwidth)")
     
     if output_pdf and (bandwidth_data or latency_data):
@@ -506,45 +528,30 @@ def plot_l2_sweep(base_directory, output_pdf=None, timeout_seconds=36, use_avg=F
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python plot_l2_sweep.py <base_directory> [output.pdf] [--timeout SECONDS]")
-        print("\nArguments:")
-        print("  base_directory           Base directory containing sweep folders")
-        print("  output.pdf               Output PDF file (optional, default: l2_sweep.pdf)")
-        print("\nOptions:")
-        print("  --timeout SECONDS        Timeout for PAR-2 calculation (default: 36)")
-        print("  --avg                    Use plain average excluding timeouts instead of PAR-2")
-        print("\nExample:")
-        print("  python plot_l2_sweep.py ../sat-isca26-data l2_sweep.pdf")
-        print("  python plot_l2_sweep.py ../sat-isca26-data l2_sweep.pdf --timeout 36")
-        print("  python plot_l2_sweep.py ../sat-isca26-data l2_sweep.pdf --timeout 36 --avg")
-        sys.exit(1)
-    
-    base_directory = sys.argv[1]
-    output_pdf = None
-    timeout_seconds = 36  # Default timeout
-    use_avg = False
-
-    # Parse remaining arguments
-    i = 2
-    while i < len(sys.argv):
-        if sys.argv[i] == '--timeout' and i + 1 < len(sys.argv):
-            timeout_seconds = float(sys.argv[i + 1])
-            i += 2
-        elif sys.argv[i] == '--avg':
-            use_avg = True
-            i += 1
-        else:
-            # Assume it's the output file if not a flag
-            if output_pdf is None and not sys.argv[i].startswith('--'):
-                output_pdf = sys.argv[i]
-            i += 1
-
-    if output_pdf is None:
-        # Auto-generate output filename
-        output_pdf = "l2_sweep.pdf"
-
-    plot_l2_sweep(base_directory, output_pdf, timeout_seconds, use_avg)
+    parser = argparse.ArgumentParser(description='Plot scores over L2 bandwidth and latency sweeps',
+                                     epilog='Example: python plot_l2_sweep.py ../sat-isca26-data l2_sweep.pdf --timeout 36 --avg')
+    parser.add_argument('base_directory',
+                       help='Base directory containing sweep folders')
+    parser.add_argument('output_pdf', nargs='?', default='l2_sweep.pdf',
+                       help='Output PDF file; _bw and _lat are appended to the name (default: l2_sweep.pdf)')
+    parser.add_argument('--timeout', type=float, default=36,
+                       help='Timeout in seconds for PAR-2 calculation (default: 36)')
+    parser.add_argument('--avg', action='store_true',
+                       help='Use plain average excluding timeouts instead of PAR-2')
+    parser.add_argument('--cache-dir', default=None,
+                       help='Reuse parsed logs cached in this directory across runs (e.g. ~/.cache/sst-sat-plots)')
+    parser.add_argument('--skip-bw', action='store_true',
+                       help='Skip the bandwidth sweep entirely (its logs are not parsed)')
+    parser.add_argument('--skip-lat', action='store_true',
+                       help='Skip the latency sweep entirely (its logs are not parsed)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(),
+                       help='Worker processes for log parsing (default: all CPUs); lower it when '
+                            'the logs live on a shared filesystem that slows down under many readers')
+
+    args = parser.parse_args()
+
+    plot_l2_sweep(args.base_directory, args.output_pdf, args.timeout, args.avg, args.cache_dir, args.jobs,
+                  args.skip_bw, args.skip_lat)
 
 
 if __name__ == "__main__":
@@ -12,16 +12,96 @@ This script:
 """
 
 import os
+import csv
+import pickle
+import hashlib
+import itertools
 import numpy as np
+import matplotlib
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 from collections import defaultdict
 import argparse
-from unified_parser import parse_log_directory, get_cache_size_from_directory, format_bytes
+from unified_parser import parse_log_directories_parallel, get_cache_size_from_directory, format_bytes
 
+# L1 components reported by the profiler, and the per-test columns averaged for them:
+# total requests and miss rate first, then each component's miss rate and misses
+_L1_COMPONENTS = ('heap', 'variables', 'watches', 'clauses', 'varactivity')
+_L1_AVERAGE_KEYS = ('l1_total_requests', 'l1_total_miss_rate') + tuple(
+    f'l1_{comp}_{field}' for comp in _L1_COMPONENTS for field in ('miss_rate', 'misses')
+)
 
-def collect_data_from_logs(base_dir):
+# Nice colors for different data structures
+_NICE_COLORS = (
+    '#2E86AB',  # Blue
+    '#A23B72',  # Purple
+    '#F18F01',  # Orange
+    '#C73E1D',  # Red
+    '#4CAF50',  # Green
+    '#FF9800',  # Amber
+    '#9C27B0',  # Purple variant
+    '#607D8B'   # Blue grey
+)
+
+# Diverse palette for the per-test lines within each group subplot
+_DIVERSE_COLORS = (
+    '#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f',
+    '#bcbd22', '#17becf', '#aec7e8', '#ffbb78', '#98df8a', '#ff9896', '#c5b0d5', '#c49c94',
+    '#f7b6d3', '#c7c7c7', '#dbdb8d', '#9edae5', '#393b79', '#637939', '#8c6d31', '#843c39',
+    '#7b4173', '#5254a3', '#8ca252', '#bd9e39', '#ad494a', '#a55194'
+)
+
+
+# Changing this script invalidates the recorded digests of earlier outputs
+_SCRIPT_MTIME_NS = os.stat(__file__).st_mtime_ns
+
+
+def inputs_digest(*inputs):
+    """Hash of a plot's inputs and options, this script's mtime and the matplotlib setup."""
+    rendering = (_SCRIPT_MTIME_NS, matplotlib.__version__, repr(sorted(matplotlib.rcParams.items())))
+    payload = pickle.dumps(rendering + inputs, protocol=pickle.HIGHEST_PROTOCOL)
+    return hashlib.sha1(payload).hexdigest()
+
+
+def _file_sha1(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def outputs_up_to_date(output_paths, digest):
+    """True if every output's .sha sidecar records digest and the output's current contents."""
+    for path in output_paths:
+        try:
+            with open(path + '.sha') as f:
+                recorded = f.read().split()
+            if recorded != [digest, _file_sha1(path)]:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def record_digest(output_paths, digest):
+    """Write a .sha sidecar with digest and the saved contents next to every output."""
+    for path in output_paths:
+        with open(path + '.sha', 'w') as f:
+            f.write(f"{digest} {_file_sha1(path)}\n")
+
+
+def format_cache_size(size):
+    """Axis label for a cache size in bytes, e.g. 4096 -> '4KiB', 2097152 -> '2MiB'."""
+    if size >= 1024*1024:
+        return f"{size//(1024*1024)}MiB"
+    elif size >= 1024:
+        return f"{size//1024}KiB"
+    return f"{size}B"
+
+
+def collect_data_from_logs(base_dir, jobs=None, parse_cache_dir=None):
     """
     Collect miss rate data from all cache size directories.
+    Logs from every directory are parsed together by up to jobs worker processes;
+    directories whose logs are unchanged are loaded from parse_cache_dir when given.
     Returns dict: {cache_size: parsed_data_list}
     """
     cache_dirs = [
@@ -33,9 +113,18 @@ def collect_data_from_logs(base_dir):
     
     data = {}
     
+    # One listing of base_dir answers the existence check for every cache directory
+    try:
+        with os.scandir(base_dir) as entries:
+            existing = {entry.name for entry in entries if entry.is_dir()}
+    except OSError:
+        existing = set()
+    
+    # Resolve the directories up front so their logs can be parsed in one pool
+    found_dirs = []
     for cache_dir in cache_dirs:
         cache_path = os.path.join(base_dir, cache_dir)
-        if not os.path.exists(cache_path):
+        if cache_dir not in existing:
             print(f"Warning: Directory {cache_path} not found")
             continue
         
@@ -44,11 +133,15 @@ def collect_data_from_logs(base_dir):
             print(f"Warning: Could not parse cache size from {cache_dir}")
             continue
         
+        found_dirs.append((cache_dir, cache_path, cache_size))
+    
+    # Parse all log files using unified parser
+    all_results = parse_log_directories_parallel([path for _, path, _ in found_dirs],
+                                                 exclude_summary=True, workers=jobs, cache_dir=parse_cache_dir)
+    
+    for (cache_dir, cache_path, cache_size), results in zip(found_dirs, all_results):
         print(f"Processing {cache_dir} (cache size: {cache_size} bytes)...")
         
-        # Parse all log files using unified parser
-        results = parse_log_directory(cache_path, exclude_summary=True)
-        
         if not results:
             print(f"Warning: No valid log files found in {cache_path}")
             continue
@@ -71,41 +164,39 @@ def calculate_averages(data):
     avg_contributions = {}
     avg_total_l1_miss_rates = {}
     
+    n_keys = len(_L1_AVERAGE_KEYS)
+    
     for cache_size, results in data.items():
         avg_miss_rates[cache_size] = {}
         avg_contributions[cache_size] = {}
         
+        # One row per test; counters a log did not report become NaN
+        values = np.fromiter((r.get(key, np.nan) for r in results for key in _L1_AVERAGE_KEYS),
+                             dtype=np.float64, count=len(results) * n_keys).reshape(len(results), n_keys)
+        
         # Filter results with L1 cache data
-        l1_results = [r for r in results if r.get('l1_total_requests', 0) > 0]
+        values = values[values[:, 0] > 0]
         
-        if not l1_results:
+        if not len(values):
             continue
-            
-        # Calculate average total L1 miss rate
-        total_miss_rates = [r['l1_total_miss_rate'] for r in l1_results]
-        avg_total_l1_miss_rates[cache_size] = np.mean(total_miss_rates)
         
-        # For each data structure, calculate averages
-        components = ['heap', 'variables', 'watches', 'clauses', 'varactivity']
+        # Calculate average total L1 miss rate
+        total_requests = values[:, 0]
+        avg_total_l1_miss_rates[cache_size] = np.mean(values[:, 1])
         
-        for comp in components:
-            miss_rate_key = f'l1_{comp}_miss_rate'
-            misses_key = f'l1_{comp}_misses'
+        # For each data structure, calculate averages over the tests that report it
+        for i, comp in enumerate(_L1_COMPONENTS):
+            miss_rates = values[:, 2 + 2 * i]
+            misses = values[:, 3 + 2 * i]
             
-            # Calculate average miss rate
-            comp_results = [r for r in l1_results if r.get(miss_rate_key) is not None]
-            if comp_results:
-                miss_rates = [r[miss_rate_key] for r in comp_results]
-                avg_miss_rates[cache_size][comp] = np.mean(miss_rates)
+            has_rate = ~np.isnan(miss_rates)
+            if has_rate.any():
+                avg_miss_rates[cache_size][comp] = np.mean(miss_rates[has_rate])
                 
                 # Calculate average contribution to total miss rate
-                contributions = []
-                for r in comp_results:
-                    if r.get(misses_key) is not None and r.get('l1_total_requests', 0) > 0:
-                        contribution = (r[misses_key] / r['l1_total_requests']) * 100
-                        contributions.append(contribution)
-                
-                if contributions:
+                has_misses = has_rate & ~np.isnan(misses)
+                if has_misses.any():
+                    contributions = misses[has_misses] / total_requests[has_misses] * 100
                     avg_contributions[cache_size][comp] = np.mean(contributions)
                 else:
                     avg_contributions[cache_size][comp] = 0.0
@@ -113,71 +204,67 @@ def calculate_averages(data):
     return avg_miss_rates, avg_contributions, avg_total_l1_miss_rates
 
 
-def create_plots(avg_miss_rates, avg_contributions, avg_total_l1_miss_rates, output_dir='.'):
-    """Create two plots as requested."""
+def ds_by_size_matrix(avg_by_size, ds_names, cache_sizes):
+    """Array of avg_by_size[cache_size][ds_name], one row per data structure (0 where missing)."""
+    matrix = np.zeros((len(ds_names), len(cache_sizes)))
+    for j, cache_size in enumerate(cache_sizes):
+        size_avgs = avg_by_size[cache_size]
+        matrix[:, j] = [size_avgs.get(ds_name, 0) for ds_name in ds_names]
+    return matrix
+
+
+def create_plots(avg_miss_rates, avg_contributions, avg_total_l1_miss_rates, output_dir='.', stacked=True,
+                 show=False, skip_unchanged=False):
+    """Create two plots as requested.
+
+    Plot 1 stacks the per-structure contributions, or overlays them as lines when
+    stacked is False.
+    The figure is displayed only when show is True, and closed once saved. With
+    skip_unchanged (and not show), nothing is redrawn when the PNG and CSV were
+    saved by an earlier run from the same inputs and have not been modified since.
+    """
+    output_path = os.path.join(output_dir, 'l1_miss_rates_by_cache_size.png')
+    csv_path = os.path.join(output_dir, 'l1_miss_rates_summary.csv')
+    digest = inputs_digest(avg_miss_rates, avg_contributions, avg_total_l1_miss_rates, stacked)
+    if skip_unchanged and not show and outputs_up_to_date([output_path, csv_path], digest):
+        print(f"Plots up to date: {output_path}")
+        return
     
     # Get sorted cache sizes and data structure names
     cache_sizes = sorted(avg_miss_rates.keys())
     
     # Get all data structure names (excluding TOTAL and ClaActivity which is usually 0)
-    all_ds_names = set()
-    for cache_data in avg_miss_rates.values():
-        all_ds_names.update(cache_data.keys())
+    all_ds_names = sorted(set().union(*avg_miss_rates.values()) - {'TOTAL'})
     
-    # Remove TOTAL and filter out data structures that are always zero
-    all_ds_names.discard('TOTAL')
-    
-    # Filter out data structures that have very low contributions across all cache sizes
-    filtered_ds_names = []
-    for ds_name in all_ds_names:
-        max_contribution = max([avg_contributions[cs].get(ds_name, 0) for cs in cache_sizes])
-        if max_contribution > 0.01:  # Only include if contribution > 0.01% somewhere
-            filtered_ds_names.append(ds_name)
-    
-    filtered_ds_names = sorted(filtered_ds_names)
+    # Filter out data structures that have very low contributions across all cache sizes,
+    # keeping the matching rows of the contribution matrix for stacking
+    all_contributions = ds_by_size_matrix(avg_contributions, all_ds_names, cache_sizes)
+    keep = all_contributions.max(axis=1, initial=0) > 0.01  # Only include if contribution > 0.01% somewhere
+    filtered_ds_names = [ds_name for ds_name, kept in zip(all_ds_names, keep) if kept]
+    contributions_matrix = all_contributions[keep]
     
     # Convert cache sizes to more readable format
-    cache_size_labels = []
-    for size in cache_sizes:
-        if size >= 1024*1024:
-            cache_size_labels.append(f"{size//(1024*1024)}MiB")
-        elif size >= 1024:
-            cache_size_labels.append(f"{size//1024}KiB")
-        else:
-            cache_size_labels.append(f"{size}B")
-    
-    # Nice colors for different data structures
-    nice_colors = [
-        '#2E86AB',  # Blue
-        '#A23B72',  # Purple
-        '#F18F01',  # Orange
-        '#C73E1D',  # Red
-        '#4CAF50',  # Green
-        '#FF9800',  # Amber
-        '#9C27B0',  # Purple variant
-        '#607D8B'   # Blue grey
-    ]
+    cache_size_labels = [format_cache_size(size) for size in cache_sizes]
     
-    # Ensure we have enough colors
-    while len(nice_colors) < len(filtered_ds_names):
-        nice_colors.extend(nice_colors)
-    
-    color_map = dict(zip(filtered_ds_names, nice_colors[:len(filtered_ds_names)]))
+    # Reuse the palette from the start if there are more data structures than colors
+    color_map = dict(zip(filtered_ds_names, itertools.cycle(_NICE_COLORS)))
     
     # Plot 1: Stacked area chart showing L1 miss rate breakdown
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
     
-    # Prepare data for stacking
-    contributions_matrix = np.zeros((len(filtered_ds_names), len(cache_sizes)))
-    for i, ds_name in enumerate(filtered_ds_names):
-        for j, cache_size in enumerate(cache_sizes):
-            contributions_matrix[i, j] = avg_contributions[cache_size].get(ds_name, 0)
+    # Per-structure miss rates for plot 2, shaped like contributions_matrix
+    miss_rate_matrix = ds_by_size_matrix(avg_miss_rates, filtered_ds_names, cache_sizes)
     
-    # Create stacked area chart
-    ax1.stackplot(cache_size_labels, *contributions_matrix, 
-                  labels=filtered_ds_names, 
-                  colors=[color_map[ds] for ds in filtered_ds_names],
-                  alpha=0.8)
+    if stacked:
+        # Create stacked area chart
+        ax1.stackplot(cache_size_labels, *contributions_matrix, 
+                      labels=filtered_ds_names, 
+                      colors=[color_map[ds] for ds in filtered_ds_names],
+                      alpha=0.8)
+    else:
+        for ds_name, contributions in zip(filtered_ds_names, contributions_matrix):
+            ax1.plot(cache_size_labels, contributions, linewidth=2,
+                    label=ds_name, color=color_map[ds_name])
     
     # Plot total L1 miss rate line on top
     total_miss_rates = [avg_total_l1_miss_rates.get(cs, 0) for cs in cache_sizes]
@@ -186,13 +273,13 @@ def create_plots(avg_miss_rates, avg_contributions, avg_total_l1_miss_rates, out
     
     ax1.set_xlabel('Cache Size')
     ax1.set_ylabel('Miss Rate (%)')
-    ax1.set_title('L1 Cache Miss Rate Breakdown by Data Structure and Cache Size (Stacked)')
+    ax1.set_title('L1 Cache Miss Rate Breakdown by Data Structure and Cache Size '
+                  + ('(Stacked)' if stacked else '(Overlaid)'))
     ax1.legend(loc='upper right')
     ax1.grid(True, alpha=0.3)
     
     # Plot 2: Individual data structure miss rates (without log scale)
-    for ds_name in filtered_ds_names:
-        miss_rates = [avg_miss_rates[cs].get(ds_name, 0) for cs in cache_sizes]
+    for ds_name, miss_rates in zip(filtered_ds_names, miss_rate_matrix):
         ax2.plot(cache_size_labels, miss_rates, marker='o', linewidth=2, 
                 label=ds_name, color=color_map[ds_name])
     
@@ -209,263 +296,189 @@ def create_plots(avg_miss_rates, avg_contributions, avg_total_l1_miss_rates, out
     plt.tight_layout()
     
     # Save plots
-    output_path = os.path.join(output_dir, 'l1_miss_rates_by_cache_size.png')
     plt.savefig(output_path, dpi=300, bbox_inches='tight')
     print(f"Plots saved to: {output_path}")
     
     # Also save data to CSV for reference
-    csv_path = os.path.join(output_dir, 'l1_miss_rates_summary.csv')
-    with open(csv_path, 'w') as f:
-        f.write('Cache_Size,Total_L1_Miss_Rate(%),')
-        f.write(','.join([f'{ds}_Miss_Rate(%)' for ds in filtered_ds_names]))
-        f.write(',')
-        f.write(','.join([f'{ds}_Contribution(%)' for ds in filtered_ds_names]))
-        f.write('\n')
-        
-        for i, cache_size in enumerate(cache_sizes):
-            f.write(f'{cache_size_labels[i]},')
-            f.write(f'{avg_total_l1_miss_rates.get(cache_size, 0)},')
-            miss_rates = [str(avg_miss_rates[cache_size].get(ds, 0)) for ds in filtered_ds_names]
-            contributions = [str(avg_contributions[cache_size].get(ds, 0)) for ds in filtered_ds_names]
-            f.write(','.join(miss_rates))
-            f.write(',')
-            f.write(','.join(contributions))
-            f.write('\n')
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(['Cache_Size', 'Total_L1_Miss_Rate(%)']
+                        + [f'{ds}_Miss_Rate(%)' for ds in filtered_ds_names]
+                        + [f'{ds}_Contribution(%)' for ds in filtered_ds_names])
+        writer.writerows(
+            [label, avg_total_l1_miss_rates.get(cache_size, 0)]
+            + [avg_miss_rates[cache_size].get(ds, 0) for ds in filtered_ds_names]
+            + [avg_contributions[cache_size].get(ds, 0) for ds in filtered_ds_names]
+            for label, cache_size in zip(cache_size_labels, cache_sizes)
+        )
     
     print(f"Data summary saved to: {csv_path}")
+    record_digest([output_path, csv_path], digest)
+    
+    if show:
+        plt.show()
+    plt.close(fig)
+
+
+def collect_test_data(data):
+    """
+    Collect each test's L1 miss rate, total requests and memory usage per cache size.
+    Shared by the individual-test and memory-clustered plots so the results are walked once.
+    Returns dict: {test_name: {cache_size: {'miss_rate': X, 'total_requests': Y, 'memory_bytes': Z}}}
+    """
+    test_data = {}
+    
+    for cache_size, results in data.items():
+        for result in results:
+            if result.get('l1_total_requests', 0) > 0:
+                test_data.setdefault(result['test_case'], {})[cache_size] = {
+                    'miss_rate': result['l1_total_miss_rate'],
+                    'total_requests': result['l1_total_requests'],
+                    'memory_bytes': result.get('total_memory_bytes', 0)
+                }
+    
+    return test_data
+
+
+def split_tests_by_average(test_data, field):
+    """
+    Average field for each test across cache sizes, and split the tests into
+    low/medium/high thirds by that average.
+    Returns (test_avg, [group1, group2, group3])
+    """
+    test_avg = {test_name: np.mean([values[field] for values in per_size.values()])
+                for test_name, per_size in test_data.items()}
+    
+    # Sort tests by their average and divide into 3 groups
+    sorted_tests = sorted(test_avg, key=test_avg.get)
+    group_size = len(sorted_tests) // 3
+    groups = [sorted_tests[:group_size], sorted_tests[group_size:2*group_size], sorted_tests[2*group_size:]]
     
-    plt.show()
+    return test_avg, groups
+
 
+def plot_test_group(ax, group_tests, group_name, test_data, cache_sizes, cache_size_labels):
+    """
+    Plot one line per test in the group, across the cache sizes it has data for.
+    All lines go into a single LineCollection and all markers into one scatter,
+    rather than one Line2D artist per test.
+    """
+    # Points sit at the cache size's index; the ticks carry the size labels
+    segments = []
+    colors = []
+    for i, test_name in enumerate(group_tests):
+        per_size = test_data[test_name]
+        points = [(j, per_size[cache_size]['miss_rate'])
+                  for j, cache_size in enumerate(cache_sizes) if cache_size in per_size]
+        
+        if len(points) > 1:  # Only plot if we have data for multiple cache sizes
+            segments.append(points)
+            colors.append(_DIVERSE_COLORS[i % len(_DIVERSE_COLORS)])
+    
+    if segments:
+        ax.add_collection(LineCollection(segments, colors=colors, linewidths=2.5, alpha=0.8))
+        points = np.concatenate(segments)
+        point_colors = np.repeat(colors, [len(segment) for segment in segments])
+        ax.scatter(points[:, 0], points[:, 1], c=point_colors, s=25, alpha=0.8, linewidths=1)
+        ax.set_xticks(range(len(cache_sizes)), cache_size_labels)
+    
+    ax.set_xlabel('Cache Size')
+    ax.set_ylabel('L1 Miss Rate (%)')
+    ax.set_title(f'{group_name} ({len(group_tests)} tests)')
+    ax.set_ylim(-5, 55)  # Set consistent y-axis range for all subplots
+    ax.grid(True, alpha=0.3)
+    ax.tick_params(axis='x', rotation=45)
 
-def create_individual_test_plot(data, output_dir='.'):
+
+def create_individual_test_plot(data, output_dir='.', test_data=None, show=False, skip_unchanged=False):
     """Create a plot showing each individual test's L1 miss rate over cache size, grouped by total requests."""
     
     # Get sorted cache sizes
     cache_sizes = sorted(data.keys())
     
     # Convert cache sizes to more readable format
-    cache_size_labels = []
-    for size in cache_sizes:
-        if size >= 1024*1024:
-            cache_size_labels.append(f"{size//(1024*1024)}MiB")
-        elif size >= 1024:
-            cache_size_labels.append(f"{size//1024}KiB")
-        else:
-            cache_size_labels.append(f"{size}B")
-    
-    # Collect all test miss rates and total requests for each cache size
-    all_test_names = set()
-    test_data = {}  # {test_name: {cache_size: {'miss_rate': X, 'total_requests': Y}}}
-    
-    # First pass: collect all unique test names and their data
-    for cache_size, results in data.items():
-        l1_results = [r for r in results if r.get('l1_total_requests', 0) > 0]
-        
-        for result in l1_results:
-            test_name = result['test_case']
-            all_test_names.add(test_name)
-            
-            if test_name not in test_data:
-                test_data[test_name] = {}
-            
-            test_data[test_name][cache_size] = {
-                'miss_rate': result['l1_total_miss_rate'],
-                'total_requests': result['l1_total_requests']
-            }
-    
-    # Calculate average total requests for each test across all cache sizes
-    test_avg_requests = {}
-    for test_name in all_test_names:
-        total_requests_list = []
-        for cache_size in cache_sizes:
-            if cache_size in test_data[test_name]:
-                total_requests_list.append(test_data[test_name][cache_size]['total_requests'])
-        
-        if total_requests_list:
-            test_avg_requests[test_name] = np.mean(total_requests_list)
+    cache_size_labels = [format_cache_size(size) for size in cache_sizes]
     
-    # Sort tests by average total requests and divide into 3 groups
-    sorted_tests = sorted(test_avg_requests.items(), key=lambda x: x[1])
-    total_tests = len(sorted_tests)
+    if test_data is None:
+        test_data = collect_test_data(data)
     
-    group_size = total_tests // 3
-    group1 = [test[0] for test in sorted_tests[:group_size]]  # Low requests
-    group2 = [test[0] for test in sorted_tests[group_size:2*group_size]]  # Medium requests
-    group3 = [test[0] for test in sorted_tests[2*group_size:]]  # High requests
+    output_path = os.path.join(output_dir, 'individual_test_l1_miss_rates.png')
+    digest = inputs_digest(cache_sizes, test_data)
+    if skip_unchanged and not show and outputs_up_to_date([output_path], digest):
+        print(f"Individual test plot up to date: {output_path}")
+        return
     
-    # Create figure with 3 subplots
-    fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 12))
-    
-    # Define a diverse color palette for each subplot
-    diverse_colors = [
-        '#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f',
-        '#bcbd22', '#17becf', '#aec7e8', '#ffbb78', '#98df8a', '#ff9896', '#c5b0d5', '#c49c94',
-        '#f7b6d3', '#c7c7c7', '#dbdb8d', '#9edae5', '#393b79', '#637939', '#8c6d31', '#843c39',
-        '#7b4173', '#5254a3', '#8ca252', '#bd9e39', '#ad494a', '#a55194'
-    ]
+    # Group tests into thirds by average total requests across all cache sizes
+    test_avg_requests, groups = split_tests_by_average(test_data, 'total_requests')
     
-    def plot_group(ax, group_tests, group_name):
-        for i, test_name in enumerate(group_tests):
-            miss_rates = []
-            valid_labels = []
-            
-            for j, cache_size in enumerate(cache_sizes):
-                if cache_size in test_data[test_name]:
-                    miss_rates.append(test_data[test_name][cache_size]['miss_rate'])
-                    valid_labels.append(cache_size_labels[j])
-            
-            if len(miss_rates) > 1:  # Only plot if we have data for multiple cache sizes
-                color = diverse_colors[i % len(diverse_colors)]
-                ax.plot(valid_labels, miss_rates, linewidth=2.5, alpha=0.8, marker='o', 
-                       color=color, markersize=5)
-        
-        ax.set_xlabel('Cache Size')
-        ax.set_ylabel('L1 Miss Rate (%)')
-        ax.set_title(f'{group_name} ({len(group_tests)} tests)')
-        ax.set_ylim(-5, 55)  # Set consistent y-axis range for all subplots
-        ax.grid(True, alpha=0.3)
-        ax.tick_params(axis='x', rotation=45)
+    # Create figure with 3 subplots
+    fig, axes = plt.subplots(3, 1, figsize=(12, 12))
     
     # Plot each group
-    if group1:
-        avg_req_group1 = np.mean([test_avg_requests[test] for test in group1])
-        plot_group(ax1, group1, f'Low Total Requests (avg: {avg_req_group1:.0f})')
-    
-    if group2:
-        avg_req_group2 = np.mean([test_avg_requests[test] for test in group2])
-        plot_group(ax2, group2, f'Medium Total Requests (avg: {avg_req_group2:.0f})')
-    
-    if group3:
-        avg_req_group3 = np.mean([test_avg_requests[test] for test in group3])
-        plot_group(ax3, group3, f'High Total Requests (avg: {avg_req_group3:.0f})')
+    for ax, group, level in zip(axes, groups, ('Low', 'Medium', 'High')):
+        if group:
+            avg_req = np.mean([test_avg_requests[test] for test in group])
+            plot_test_group(ax, group, f'{level} Total Requests (avg: {avg_req:.0f})',
+                            test_data, cache_sizes, cache_size_labels)
     
     plt.suptitle('Individual Test L1 Cache Miss Rates by Cache Size (Grouped by Total Requests)', 
                  fontsize=14, y=0.98)
     plt.tight_layout()
     
     # Save the individual test plot
-    output_path = os.path.join(output_dir, 'individual_test_l1_miss_rates.png')
     plt.savefig(output_path, dpi=300, bbox_inches='tight')
     print(f"Individual test plot saved to: {output_path}")
+    record_digest([output_path], digest)
     
-    plt.show()
+    if show:
+        plt.show()
+    plt.close(fig)
 
 
-def create_memory_clustered_plot(data, output_dir='.'):
+def create_memory_clustered_plot(data, output_dir='.', test_data=None, show=False, skip_unchanged=False):
     """Create a plot showing each individual test's L1 miss rate over cache size, grouped by memory usage."""
     
     # Get sorted cache sizes
     cache_sizes = sorted(data.keys())
     
     # Convert cache sizes to more readable format
-    cache_size_labels = []
-    for size in cache_sizes:
-        if size >= 1024*1024:
-            cache_size_labels.append(f"{size//(1024*1024)}MiB")
-        elif size >= 1024:
-            cache_size_labels.append(f"{size//1024}KiB")
-        else:
-            cache_size_labels.append(f"{size}B")
-    
-    # Collect all test miss rates and memory usage for each cache size
-    all_test_names = set()
-    test_data = {}  # {test_name: {cache_size: {'miss_rate': X, 'memory_bytes': Y}}}
-    
-    # First pass: collect all unique test names and their data
-    for cache_size, results in data.items():
-        l1_results = [r for r in results if r.get('l1_total_requests', 0) > 0]
-        
-        for result in l1_results:
-            test_name = result['test_case']
-            all_test_names.add(test_name)
-            
-            if test_name not in test_data:
-                test_data[test_name] = {}
-            
-            test_data[test_name][cache_size] = {
-                'miss_rate': result['l1_total_miss_rate'],
-                'memory_bytes': result.get('total_memory_bytes', 0)
-            }
-    
-    # Calculate average memory usage for each test across all cache sizes
-    test_avg_memory = {}
-    for test_name in all_test_names:
-        memory_list = []
-        for cache_size in cache_sizes:
-            if cache_size in test_data[test_name]:
-                memory_list.append(test_data[test_name][cache_size]['memory_bytes'])
-        
-        if memory_list:
-            test_avg_memory[test_name] = np.mean(memory_list)
+    cache_size_labels = [format_cache_size(size) for size in cache_sizes]
     
-    # Sort tests by average memory usage and divide into 3 groups
-    sorted_tests = sorted(test_avg_memory.items(), key=lambda x: x[1])
-    total_tests = len(sorted_tests)
+    if test_data is None:
+        test_data = collect_test_data(data)
     
-    group_size = total_tests // 3
-    group1 = [test[0] for test in sorted_tests[:group_size]]  # Low memory
-    group2 = [test[0] for test in sorted_tests[group_size:2*group_size]]  # Medium memory
-    group3 = [test[0] for test in sorted_tests[2*group_size:]]  # High memory
+    output_path = os.path.join(output_dir, 'memory_clustered_l1_miss_rates.png')
+    digest = inputs_digest(cache_sizes, test_data)
+    if skip_unchanged and not show and outputs_up_to_date([output_path], digest):
+        print(f"Memory-clustered plot up to date: {output_path}")
+        return
     
-    # Create figure with 3 subplots
-    fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 12))
-    
-    # Define a diverse color palette for each subplot
-    diverse_colors = [
-        '#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f',
-        '#bcbd22', '#17becf', '#aec7e8', '#ffbb78', '#98df8a', '#ff9896', '#c5b0d5', '#c49c94',
-        '#f7b6d3', '#c7c7c7', '#dbdb8d', '#9edae5', '#393b79', '#637939', '#8c6d31', '#843c39',
-        '#7b4173', '#5254a3', '#8ca252', '#bd9e39', '#ad494a', '#a55194'
-    ]
+    # Group tests into thirds by average memory usage across all cache sizes
+    test_avg_memory, groups = split_tests_by_average(test_data, 'memory_bytes')
     
-    def plot_group(ax, group_tests, group_name):
-        for i, test_name in enumerate(group_tests):
-            miss_rates = []
-            valid_labels = []
-            
-            for j, cache_size in enumerate(cache_sizes):
-                if cache_size in test_data[test_name]:
-                    miss_rates.append(test_data[test_name][cache_size]['miss_rate'])
-                    valid_labels.append(cache_size_labels[j])
-            
-            if len(miss_rates) > 1:  # Only plot if we have data for multiple cache sizes
-                color = diverse_colors[i % len(diverse_colors)]
-                ax.plot(valid_labels, miss_rates, linewidth=2.5, alpha=0.8, marker='o', 
-                       color=color, markersize=5)
-        
-        ax.set_xlabel('Cache Size')
-        ax.set_ylabel('L1 Miss Rate (%)')
-        ax.set_title(f'{group_name} ({len(group_tests)} tests)')
-        ax.set_ylim(-5, 55)  # Set consistent y-axis range for all subplots
-        ax.grid(True, alpha=0.3)
-        ax.tick_params(axis='x', rotation=45)
+    # Create figure with 3 subplots
+    fig, axes = plt.subplots(3, 1, figsize=(12, 12))
     
     # Plot each group with memory information
-    if group1:
-        avg_memory_group1 = np.mean([test_avg_memory[test] for test in group1])
-        memory_str1 = format_bytes(avg_memory_group1) if avg_memory_group1 > 0 else "0 B"
-        plot_group(ax1, group1, f'Low Memory Usage (avg: {memory_str1})')
-    
-    if group2:
-        avg_memory_group2 = np.mean([test_avg_memory[test] for test in group2])
-        memory_str2 = format_bytes(avg_memory_group2) if avg_memory_group2 > 0 else "0 B"
-        plot_group(ax2, group2, f'Medium Memory Usage (avg: {memory_str2})')
-    
-    if group3:
-        avg_memory_group3 = np.mean([test_avg_memory[test] for test in group3])
-        memory_str3 = format_bytes(avg_memory_group3) if avg_memory_group3 > 0 else "0 B"
-        plot_group(ax3, group3, f'High Memory Usage (avg: {memory_str3})')
+    for ax, group, level in zip(axes, groups, ('Low', 'Medium', 'High')):
+        if group:
+            avg_memory = np.mean([test_avg_memory[test] for test in group])
+            memory_str = format_bytes(avg_memory) if avg_memory > 0 else "0 B"
+            plot_test_group(ax, group, f'{level} Memory Usage (avg: {memory_str})',
+                            test_data, cache_sizes, cache_size_labels)
     
     plt.suptitle('Individual Test L1 Cache Miss Rates by Cache Size (Grouped by Memory Usage)', 
                  fontsize=14, y=0.98)
     plt.tight_layout()
     
     # Save the memory-clustered plot
-    output_path = os.path.join(output_dir, 'memory_clustered_l1_miss_rates.png')
     plt.savefig(output_path, dpi=300, bbox_inches='tight')
     print(f"Memory-clustered plot saved to: {output_path}")
+    record_digest([output_path], digest)
     
-    plt.show()
+    if show:
+        plt.show()
+    plt.close(fig)
 
 
 def main():
@@ -474,11 +487,26 @@ def main():
                        help='Base directory containing cache size subdirectories (default: ./runs)')
     parser.add_argument('--output-dir', default='.', 
                        help='Output directory for plots and CSV (default: current directory)')
+    parser.add_argument('--show', action='store_true',
+                       help='Display each figure after saving it (default: only save files)')
+    parser.add_argument('--skip-unchanged', action='store_true',
+                       help='Skip redrawing plots whose inputs match an earlier run in --output-dir and whose '
+                            'files are unmodified (logs are still parsed)')
+    parser.add_argument('--no-stack', action='store_true',
+                       help='Draw the miss rate breakdown as overlaid lines instead of stacked areas')
+    parser.add_argument('--cache-dir', default=None,
+                       help='Reuse parsed logs cached in this directory across runs (e.g. ~/.cache/sst-sat-plots)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(),
+                       help='Worker processes for log parsing (default: all CPUs); 1 parses in-process for debugging')
     
     args = parser.parse_args()
     
+    if not args.show:
+        # Nothing is displayed, so skip initializing an interactive backend
+        matplotlib.use('Agg')
+    
     print("Collecting data from log files...")
-    data = collect_data_from_logs(args.base_dir)
+    data = collect_data_from_logs(args.base_dir, args.jobs, args.cache_dir)
     
     if not data:
         print("No data collected. Please check the directory structure and log files.")
@@ -488,13 +516,17 @@ def main():
     avg_miss_rates, avg_contributions, avg_total_l1_miss_rates = calculate_averages(data)
     
     print("\nCreating plots...")
-    create_plots(avg_miss_rates, avg_contributions, avg_total_l1_miss_rates, args.output_dir)
+    create_plots(avg_miss_rates, avg_contributions, avg_total_l1_miss_rates, args.output_dir,
+                 stacked=not args.no_stack, show=args.show, skip_unchanged=args.skip_unchanged)
+    
+    # Per-test series are shared by the individual-test and memory-clustered plots
+    test_data = collect_test_data(data)
     
     print("\nCreating individual test plot...")
-    create_individual_test_plot(data, args.output_dir)
+    create_individual_test_plot(data, args.output_dir, test_data, show=args.show, skip_unchanged=args.skip_unchanged)
 
     print("\nCreating memory-clustered plot...")
-    create_memory_clustered_plot(data, args.output_dir)
+    create_memory_clustered_plot(data, args.output_dir, test_data, show=args.show, skip_unchanged=args.skip_unchanged)
     
     print("\nDone!")
 
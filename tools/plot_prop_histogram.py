@@ -13,23 +13,37 @@ This script:
 
 import sys
 import os
+import argparse
+import itertools
 import numpy as np
-import matplotlib.pyplot as plt
+from functools import lru_cache
 from pathlib import Path
-from unified_parser import parse_log_directory
-from mpl_toolkits.axes_grid1 import make_axes_locatable
-import matplotlib.patches as mpatches
+from unified_parser import parse_log_directories_parallel
 
 
-def collect_histogram_data(log_dir):
+def iter_finished_tests(results):
+    """Yield the histogram fields of each finished or UNKNOWN test (SAT/UNSAT/UNKNOWN).
+
+    Each record keeps only what aggregate_histogram reads, so the rest of every
+    parsed log dict can be freed once the caller drops the parse results.
+    """
+    for r in results:
+        if r.get('result') in ('SAT', 'UNSAT', 'UNKNOWN'):
+            yield {'watchers_bins': r.get('watchers_bins'),
+                   'variables_bins': r.get('variables_bins'),
+                   'result': r['result']}
+
+
+def collect_histogram_data(log_dir, jobs=None):
     """
     Collect histogram data from log directory, supporting multi-seed layout.
     
     Args:
         log_dir: Path to directory containing log files or seed* subdirectories
+        jobs: Worker processes parsing the logs of all seeds together (default: all CPUs)
     
     Returns:
-        List of parsed log data dictionaries from finished tests
+        List of finished-test records as yielded by iter_finished_tests
     """
     log_dir = Path(log_dir)
     
@@ -40,28 +54,97 @@ def collect_histogram_data(log_dir):
     # Check for multi-seed layout
     seed_dirs = sorted([d for d in log_dir.glob('seed*') if d.is_dir()])
     
-    all_results = []
-    
     if seed_dirs:
         # Multi-seed mode
         print(f"Detected {len(seed_dirs)} seed folders")
-        for seed_dir in seed_dirs:
-            results = parse_log_directory(seed_dir, exclude_summary=True)
-            if results:
-                all_results.extend(results)
+        all_results = list(itertools.chain.from_iterable(
+            parse_log_directories_parallel(seed_dirs, exclude_summary=True, workers=jobs)))
         print(f"Collected {len(all_results)} total tests from all seeds")
     else:
         # Single directory mode
-        all_results = parse_log_directory(log_dir, exclude_summary=True)
+        all_results = parse_log_directories_parallel([log_dir], exclude_summary=True, workers=jobs)[0]
         print(f"Collected {len(all_results)} tests")
     
-    # Include finished and UNKNOWN tests (SAT/UNSAT/UNKNOWN)
-    finished = [r for r in all_results if r.get('result') in ('SAT', 'UNSAT', 'UNKNOWN')]
+    # Only the slim records outlive this function; the full parse dicts are released on return
+    finished = list(iter_finished_tests(all_results))
     print(f"Included tests (SAT/UNSAT/UNKNOWN): {len(finished)}")
     
     return finished
 
 
+@lru_cache(maxsize=128)
+def _decode_bin_key(bin_key, threshold):
+    """Map a histogram bin key to (display_index, weight), or None to drop it.
+
+    display_index is 0 for bin 0, which only feeds the denominator, and threshold
+    for the merged '≥ threshold' bin. weight is the index a bin's percentage is
+    multiplied by: its exact index, the range midpoint above the threshold, or 25
+    for out_of_bounds. Negative and unparseable keys are dropped.
+    """
+    if bin_key == 'out_of_bounds':
+        # Per user guidance, use 25 as the representative index for OOB
+        return threshold, 25.0
+    if isinstance(bin_key, str) and '-' in bin_key:
+        start_str, _, end_str = bin_key.partition('-')
+        try:
+            start = int(start_str)
+            end = int(end_str)
+        except ValueError:
+            return None
+        if start < 0:
+            return None
+        if start >= threshold:
+            # Use midpoint of the range as representative index
+            return threshold, (start + end) / 2.0
+        return start, float(start)
+    try:
+        start = int(bin_key)
+    except ValueError:
+        return None
+    if start < 0:
+        return None
+    return min(start, threshold), float(start)
+
+
+def _decode_bins(bins, threshold):
+    """List (display_index, count, weight) for each non-empty bin _decode_bin_key keeps."""
+    decoded = []
+    for bin_key, values in bins.items():
+        count = values.samples
+        if count == 0:
+            continue
+        target = _decode_bin_key(bin_key, threshold)
+        if target is not None:
+            decoded.append((target[0], count, target[1]))
+    return decoded
+
+
+def _accumulate_histograms(indices, counts, weights, test_ids, num_tests, threshold):
+    """Sum per-test bin percentages over display bins 0..threshold for all tests at once.
+
+    indices/counts/weights hold the decoded bins of every test back to back and
+    test_ids gives the test each entry belongs to. Tests without
+    samples are skipped. Returns (sum_orig, sum_index_weighted, agg_counts,
+    num_counted_tests).
+    """
+    num_slots = threshold + 1
+    per_test = np.bincount(test_ids * num_slots + indices, weights=counts,
+                           minlength=num_tests * num_slots).reshape(num_tests, num_slots)
+    agg_counts = per_test.sum(axis=0).astype(np.int64)
+
+    # Totals (denominator): include bin0 + in-range + all OOB counts
+    totals = per_test.sum(axis=1)
+    counted = totals > 0
+    sum_orig = (per_test[counted] / totals[counted, None] * 100.0).sum(axis=0)
+
+    # Weight each bin's percentage by its own index; the merged last bin sums
+    # its sub-bins' contributions
+    pct = counts / totals[test_ids] * 100.0
+    sum_index_weighted = np.bincount(indices, weights=weights * pct, minlength=num_slots)
+
+    return sum_orig, sum_index_weighted, agg_counts, int(np.count_nonzero(counted))
+
+
 def aggregate_histogram(results, histogram_key, num_bins=11):
     """Aggregate histogram data and compute per-bin index-weighted percentages.
 
@@ -80,111 +163,69 @@ def aggregate_histogram(results, histogram_key, num_bins=11):
     Returns:
         (labels, avg_original_percentages, avg_index_weighted_percentages, agg_raw_counts)
     """
-    threshold = num_bins - 1  # e.g., for 11 bins, threshold=10, display bins are 1..9 and '≥ 10'
-    inrange_indices = list(range(1, threshold))
-    labels = [str(i) for i in inrange_indices] + [f'≥ {threshold}']
+    return aggregate_histograms(results, (histogram_key,), num_bins)[histogram_key]
 
-    # Accumulators for averaging (percentages)
-    sum_orig = [0.0 for _ in labels]
-    sum_index_weighted = [0.0 for _ in labels]
-    num_tests = 0
 
-    # Aggregated raw counts across all tests (for printing counts)
-    agg_counts = {i: 0 for i in inrange_indices}
-    agg_counts_oob = 0
+def aggregate_histograms(results, histogram_keys=('watchers_bins', 'variables_bins'), num_bins=11):
+    """Aggregate several histograms in a single pass over results.
 
+    Returns a dict mapping each key in histogram_keys to the tuple
+    aggregate_histogram would return for it.
+    """
+    threshold = num_bins - 1  # e.g., for 11 bins, threshold=10, display bins are 1..9 and '≥ 10'
+    # Decoded bins of all tests back to back, and how many belong to each test
+    entries = {key: [] for key in histogram_keys}
+    lengths = {key: [] for key in histogram_keys}
     for r in results:
-        bins = r.get(histogram_key, {}) or {}
-        # Per-test counts
-        counts = {i: 0 for i in inrange_indices}
-        # Track detailed out-of-bound contributions for proper weighting
-        # Each entry: (weight_index, count)
-        oob_details = []
-        oob_total_count = 0  # total samples in ≥ threshold including out_of_bounds
-        bin0 = 0         # count for bin 0 (or 0-range)
-
-        for bin_key, values in bins.items():
-            count = values.get('samples', 0) or 0
-            if count == 0:
-                continue
-
-            if bin_key == 'out_of_bounds':
-                # Assign a representative index weight for OOB bucket
-                # Per user guidance, use 25 for out_of_bounds
-                oob_details.append((25.0, count))
-                oob_total_count += count
-            elif isinstance(bin_key, str) and '-' in bin_key:
-                start_str, end_str = bin_key.split('-')
-                try:
-                    start = int(start_str)
-                    end = int(end_str)
-                except ValueError:
-                    continue
-                if start < 1:
-                    if start == 0:
-                        bin0 += count
-                    continue  # drop negatives
-                if start >= threshold:
-                    # Use midpoint of the range as representative index
-                    mid = (start + end) / 2.0
-                    oob_details.append((mid, count))
-                    oob_total_count += count
-                else:
-                    counts[start] = counts.get(start, 0) + count
-            else:
-                try:
-                    idx = int(bin_key)
-                except ValueError:
-                    continue
-                if idx < 1:
-                    if idx == 0:
-                        bin0 += count
-                    continue
-                if idx >= threshold:
-                    oob_details.append((float(idx), count))
-                    oob_total_count += count
-                else:
-                    counts[idx] = counts.get(idx, 0) + count
-
-        # Aggregate raw counts
-        for i in inrange_indices:
-            agg_counts[i] += counts.get(i, 0)
-        agg_counts_oob += oob_total_count
-
-        # Totals (denominator): include bin0 + in-range + all OOB counts
-        total = bin0 + sum(counts.values()) + oob_total_count
-        if total == 0:
-            continue
+        for key in histogram_keys:
+            decoded = _decode_bins(r.get(key, {}) or {}, threshold)
+            entries[key].extend(decoded)
+            lengths[key].append(len(decoded))
+    return {key: _summarize_histogram(entries[key], lengths[key], threshold) for key in histogram_keys}
 
-        # Per-test percentages (unweighted)
-        per_orig = [ (counts[i] / total * 100.0) for i in inrange_indices ]
-        per_orig_oob = (oob_total_count) / total * 100.0
-        per_orig.append(per_orig_oob)
 
-        # Index-weighted percentages (multiply each percentage by bin index)
-        per_weighted = [ (i * (counts[i] / total * 100.0)) for i in inrange_indices ]
-        # For ≥ threshold display bin, sum detailed contributions using their own indices/weights
-        per_weighted_oob = sum((w * (cnt / total * 100.0)) for (w, cnt) in oob_details)
-        per_weighted.append(per_weighted_oob)
+def _summarize_histogram(entries, lengths, threshold):
+    """Average the decoded bins of every test into aggregate_histogram's return tuple."""
+    labels = [str(i) for i in range(1, threshold)] + [f'≥ {threshold}']
 
-        # Accumulate
-        sum_orig = [a + b for a, b in zip(sum_orig, per_orig)]
-        sum_index_weighted = [a + b for a, b in zip(sum_index_weighted, per_weighted)]
-        num_tests += 1
+    if not lengths:
+        return [], [], [], []
+    # One array for all tests; percentages are then computed for every test at once
+    table = np.array(entries, dtype=np.float64).reshape(-1, 3)
+    indices = table[:, 0].astype(np.intp)
+    test_ids = np.repeat(np.arange(len(lengths)), lengths)
 
+    sum_orig, sum_index_weighted, agg_counts, num_tests = _accumulate_histograms(
+        indices, table[:, 1], table[:, 2], test_ids, len(lengths), threshold)
     if num_tests == 0:
         return [], [], [], []
 
-    avg_orig = [v / num_tests for v in sum_orig]
-    avg_weighted = [v / num_tests for v in sum_index_weighted]
+    avg_orig = (sum_orig[1:] / num_tests).tolist()
+    avg_weighted = (sum_index_weighted[1:] / num_tests).tolist()
 
-    # Build aggregated counts aligned to labels
-    agg_counts_list = [agg_counts[i] for i in inrange_indices] + [agg_counts_oob]
+    return labels, avg_orig, avg_weighted, agg_counts[1:].tolist()
 
-    return labels, avg_orig, avg_weighted, agg_counts_list
 
+def _label_bars(ax, bars, values, ylim_top, skip_first=False):
+    """Label each bar with its rounded percentage via ax.bar_label.
 
-def plot_propagation_histograms(results, output_pdf, weighted_only=False):
+    Bars cut off by the y-axis limit get their label inside the plot near the
+    top instead. skip_first leaves the first bar unlabeled.
+    """
+    labels = [f'{round(pct)}' for pct in values]
+    if skip_first:
+        labels[0] = ''
+    cut_off = [bar.get_height() >= ylim_top * 0.95 for bar in bars]
+    ax.bar_label(bars, labels=['' if cut else label for label, cut in zip(labels, cut_off)],
+                 fontsize=16, fontweight='bold')
+    for bar, label, cut in zip(bars, labels, cut_off):
+        if cut and label:
+            # Show value inside bar if cut off
+            ax.text(bar.get_x() + bar.get_width() / 2, ylim_top * 0.85, label,
+                    ha='center', va='top', fontsize=16, fontweight='bold', color='black')
+
+
+def plot_propagation_histograms(results, output_pdf, weighted_only=False, histograms=None):
     """
     Create PDF plot with watcher and literal histograms in 2 subplots (top/bottom).
     Each subplot shows both weighted and unweighted percentages side by side.
@@ -193,11 +234,16 @@ def plot_propagation_histograms(results, output_pdf, weighted_only=False):
         results: List of parsed log data dictionaries (finished tests only)
         output_pdf: Path to output PDF file
         weighted_only: If True, plot only the weighted bars (centered, no unweighted series)
+        histograms: aggregate_histograms output for results, so several plots of the
+                    same tests decode and average the bins only once
     """
     if not results:
         print("Error: No finished test data to plot")
         return
 
+    # Only plotting needs pyplot; callers that just collect or aggregate never import it
+    import matplotlib.pyplot as plt
+
     # Create figure with 2 subplots (top and bottom)
     # Increase global font size for all text elements
     plt.rcParams.update({'font.size': 20})
@@ -207,8 +253,12 @@ def plot_propagation_histograms(results, output_pdf, weighted_only=False):
     ax1 = plt.subplot(2, 1, 1)
     ax2 = plt.subplot(2, 1, 2)
 
+    # Aggregate both histograms in one pass over the tests
+    if histograms is None:
+        histograms = aggregate_histograms(results, ('watchers_bins', 'variables_bins'), num_bins=11)
+
     # Plot 1: Watchers Histogram (top) - both weighted and unweighted percentages
-    watcher_labels, watcher_original, watcher_weighted, watcher_counts = aggregate_histogram(results, 'watchers_bins', num_bins=11)
+    watcher_labels, watcher_original, watcher_weighted, watcher_counts = histograms['watchers_bins']
 
     if watcher_labels:
         x_pos = np.arange(len(watcher_labels))
@@ -266,30 +316,10 @@ def plot_propagation_histograms(results, output_pdf, weighted_only=False):
         # Add percentage labels on top of bars (only if within ylim)
         ylim = ax1.get_ylim()
         if not weighted_only:
-            for idx, (bar, pct) in enumerate(zip(bars1a, watcher_original)):
-                # Skip bin 1 unweighted label if it equals weighted (bin 1 is index 0)
-                if idx == 0 and abs(watcher_original[0] - watcher_weighted[0]) < 0.01:
-                    continue
-                height = bar.get_height()
-                if height < ylim[1] * 0.95:  # Only show if not cut off
-                    ax1.text(bar.get_x() + bar.get_width() / 2, height,
-                             f'{round(pct)}',
-                             ha='center', va='bottom', fontsize=16, fontweight='bold')
-                else:
-                    # Show value inside bar if cut off
-                    ax1.text(bar.get_x() + bar.get_width() / 2, ylim[1] * 0.85,
-                             f'{round(pct)}',
-                             ha='center', va='top', fontsize=16, fontweight='bold', color='black')
-        for idx, (bar, pct) in enumerate(zip(bars1b, watcher_weighted)):
-            height = bar.get_height()
-            if height < ylim[1] * 0.95:
-                ax1.text(bar.get_x() + bar.get_width() / 2, height,
-                         f'{round(pct)}',
-                         ha='center', va='bottom', fontsize=16, fontweight='bold')
-            else:
-                ax1.text(bar.get_x() + bar.get_width() / 2, ylim[1] * 0.85,
-                         f'{round(pct)}',
-                         ha='center', va='top', fontsize=16, fontweight='bold', color='black')
+            # Skip bin 1 unweighted label if it equals weighted (bin 1 is index 0)
+            _label_bars(ax1, bars1a, watcher_original, ylim[1],
+                        skip_first=abs(watcher_original[0] - watcher_weighted[0]) < 0.01)
+        _label_bars(ax1, bars1b, watcher_weighted, ylim[1])
 
         if not use_broken_axis:
             # Set y-axis limit with some headroom for labels
@@ -305,7 +335,7 @@ def plot_propagation_histograms(results, output_pdf, weighted_only=False):
         ax1.set_ylim(0, 1)
 
     # Plot 2: Variables (Literals) Histogram (bottom) - both weighted and unweighted percentages
-    variable_labels, variable_original, variable_weighted, variable_counts = aggregate_histogram(results, 'variables_bins', num_bins=11)
+    variable_labels, variable_original, variable_weighted, variable_counts = histograms['variables_bins']
 
     if variable_labels:
         x_pos = np.arange(len(variable_labels))
@@ -363,30 +393,10 @@ def plot_propagation_histograms(results, output_pdf, weighted_only=False):
         # Add percentage labels on top of bars (only if within ylim)
         ylim = ax2.get_ylim()
         if not weighted_only:
-            for idx, (bar, pct) in enumerate(zip(bars2a, variable_original)):
-                # Skip bin 1 unweighted label if it equals weighted (bin 1 is index 0)
-                if idx == 0 and abs(variable_original[0] - variable_weighted[0]) < 0.01:
-                    continue
-                height = bar.get_height()
-                if height < ylim[1] * 0.95:  # Only show if not cut off
-                    ax2.text(bar.get_x() + bar.get_width() / 2, height,
-                             f'{round(pct)}',
-                             ha='center', va='bottom', fontsize=16, fontweight='bold')
-                else:
-                    # Show value inside bar if cut off
-                    ax2.text(bar.get_x() + bar.get_width() / 2, ylim[1] * 0.85,
-                             f'{round(pct)}',
-                             ha='center', va='top', fontsize=16, fontweight='bold', color='black')
-        for idx, (bar, pct) in enumerate(zip(bars2b, variable_weighted)):
-            height = bar.get_height()
-            if height < ylim[1] * 0.95:
-                ax2.text(bar.get_x() + bar.get_width() / 2, height,
-                         f'{round(pct)}',
-                         ha='center', va='bottom', fontsize=16, fontweight='bold')
-            else:
-                ax2.text(bar.get_x() + bar.get_width() / 2, ylim[1] * 0.85,
-                         f'{round(pct)}',
-                         ha='center', va='top', fontsize=16, fontweight='bold', color='black')
+            # Skip bin 1 unweighted label if it equals weighted (bin 1 is index 0)
+            _label_bars(ax2, bars2a, variable_original, ylim[1],
+                        skip_first=abs(variable_original[0] - variable_weighted[0]) < 0.01)
+        _label_bars(ax2, bars2b, variable_weighted, ylim[1])
 
         if not use_broken_axis:
             # Set y-axis limit with some headroom for labels
@@ -428,31 +438,39 @@ def plot_propagation_histograms(results, output_pdf, weighted_only=False):
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python plot_prop_histogram.py <logs_folder> [output.pdf]")
-        print("Example: python plot_prop_histogram.py ../runs/logs prop_histogram.pdf")
-        print("\nThe logs_folder can contain:")
-        print("  - Log files directly")
-        print("  - seed* subdirectories (multi-seed mode)")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description='Plot watcher and literal propagation histograms from SAT solver logs',
+                                     epilog='Example: python plot_prop_histogram.py ../runs/logs prop_histogram.pdf')
+    parser.add_argument('logs_folder',
+                       help='Directory containing log files directly or seed* subdirectories (multi-seed mode)')
+    parser.add_argument('output_pdf', nargs='?', default='prop_histogram.pdf',
+                       help='Output PDF file (default: prop_histogram.pdf)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(),
+                       help='Worker processes for log parsing (default: all CPUs); 1 parses in-process')
     
-    logs_folder = sys.argv[1]
-    output_pdf = sys.argv[2] if len(sys.argv) > 2 else "prop_histogram.pdf"
+    args = parser.parse_args()
+    output_pdf = args.output_pdf
     
     # Collect data from logs (supports multi-seed)
-    finished_results = collect_histogram_data(logs_folder)
+    finished_results = collect_histogram_data(args.logs_folder, args.jobs)
     
     if not finished_results:
         print("Error: No finished test data found")
         sys.exit(1)
     
+    # Only PDFs are written, so skip initializing an interactive GUI backend
+    import matplotlib
+    matplotlib.use('Agg')
+    
+    # Decode and average the bins once for both PDFs
+    histograms = aggregate_histograms(finished_results, ('watchers_bins', 'variables_bins'), num_bins=11)
+    
     # Generate plots
-    plot_propagation_histograms(finished_results, output_pdf)
+    plot_propagation_histograms(finished_results, output_pdf, histograms=histograms)
 
     # Also generate weighted-only PDF
     stem, ext = os.path.splitext(output_pdf)
     weighted_pdf = stem + '_weighted' + (ext if ext else '.pdf')
-    plot_propagation_histograms(finished_results, weighted_pdf, weighted_only=True)
+    plot_propagation_histograms(finished_results, weighted_pdf, weighted_only=True, histograms=histograms)
 
 
 if __name__ == "__main__":
@@ -11,6 +11,9 @@ This module provides a unified parser for SAT solver log files that extracts:
 - Clauses Fragmentation statistics
 - Cycle Statistics
 - Simulated time
+- Histograms (watchers, variables, ...) as {bin: BinStats(samples, percentage)}
+  dicts; BinStats is a named tuple that also accepts bin['samples'] but is no
+  longer a dict, so JSON dumps show each bin as a [samples, percentage] list
 
 Usage:
     from unified_parser import parse_log_file, parse_log_directory
@@ -20,12 +23,45 @@ Usage:
     
     # Parse all files in directory
     all_data = parse_log_directory('path/to/logs/')
+    
+    # Same, spread across worker processes
+    all_data = parse_log_directory_parallel('path/to/logs/', workers=8)
+    
+    # Several directories (e.g. seed folders) through one shared pool,
+    # reusing results cached on disk by earlier runs
+    per_dir = parse_log_directories_parallel(['run/seed0', 'run/seed1'],
+                                             cache_dir='~/.cache/sst-sat-plots')
 """
 
+import contextlib
 import os
 import re
 import csv
+import pickle
+import hashlib
+import multiprocessing
+from functools import lru_cache
 from pathlib import Path
+from typing import NamedTuple
+
+
+class BinStats(NamedTuple):
+    """
+    Sample count and share of one histogram bin.
+    
+    Histogram bins used to be {'samples': ..., 'percentage': ...} dicts, and
+    bins[key]['samples'] still works. Other dict methods do not, and json.dump
+    writes a bin as [samples, percentage]; use ._asdict() for the old object form.
+    """
+    samples: int
+    percentage: float
+    
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key not in self._fields:
+                raise KeyError(key)
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
 
 
 def detect_log_format(content):
@@ -501,68 +537,79 @@ def parse_clauses_fragmentation(content):
     return frag_stats
 
 
+# Cycle Statistics section and the per-stage lines inside it, compiled once
+_CYCLE_SECTION_RE = re.compile(r'===+\[ Cycle Statistics \]===+\n(.*?)\n=+', re.DOTALL)
+_CYCLE_PATTERNS = {
+    'propagate_cycles': re.compile(r'Propagate\s*:\s*[\d.]+%\s*\((\d+) cycles\)'),
+    'analyze_cycles': re.compile(r'Analyze\s*:\s*[\d.]+%\s*\((\d+) cycles\)'),
+    'minimize_cycles': re.compile(r'Minimize\s*:\s*[\d.]+%\s*\((\d+) cycles\)'),
+    'backtrack_cycles': re.compile(r'Backtrack\s*:\s*[\d.]+%\s*\((\d+) cycles\)'),
+    'decision_cycles': re.compile(r'Decision\s*:\s*[\d.]+%\s*\((\d+) cycles\)'),
+    'reduce_db_cycles': re.compile(r'Reduce DB\s*:\s*[\d.]+%\s*\((\d+) cycles\)'),
+    'heap_insert_cycles': re.compile(r'Heap\s+Insert\s*:\s*[\d.]+%\s*\((\d+) cycles\)'),
+    'heap_bump_cycles': re.compile(r'Heap\s+Bump\s*:\s*[\d.]+%\s*\((\d+) cycles\)'),
+    'restart_cycles': re.compile(r'Restart\s*:\s*[\d.]+%\s*\((\d+) cycles\)'),
+    'total_counted_cycles': re.compile(r'Total Counted:\s*(\d+) cycles')
+}
+
+
 def parse_cycle_statistics(content):
     """Parse Cycle Statistics section."""
     cycle_stats = {}
     
     # Find cycle statistics section
-    cycle_section = re.search(
-        r'===+\[ Cycle Statistics \]===+\n(.*?)\n=+',
-        content, re.DOTALL
-    )
+    cycle_section = _CYCLE_SECTION_RE.search(content)
     
     if cycle_section:
         cycle_text = cycle_section.group(1)
         
         # Parse individual cycle types
-        cycle_patterns = {
-            'propagate_cycles': r'Propagate\s*:\s*[\d.]+%\s*\((\d+) cycles\)',
-            'analyze_cycles': r'Analyze\s*:\s*[\d.]+%\s*\((\d+) cycles\)',
-            'minimize_cycles': r'Minimize\s*:\s*[\d.]+%\s*\((\d+) cycles\)',
-            'backtrack_cycles': r'Backtrack\s*:\s*[\d.]+%\s*\((\d+) cycles\)',
-            'decision_cycles': r'Decision\s*:\s*[\d.]+%\s*\((\d+) cycles\)',
-            'reduce_db_cycles': r'Reduce DB\s*:\s*[\d.]+%\s*\((\d+) cycles\)',
-            'heap_insert_cycles': r'Heap\s+Insert\s*:\s*[\d.]+%\s*\((\d+) cycles\)',
-            'heap_bump_cycles': r'Heap\s+Bump\s*:\s*[\d.]+%\s*\((\d+) cycles\)',
-            'restart_cycles': r'Restart\s*:\s*[\d.]+%\s*\((\d+) cycles\)',
-            'total_counted_cycles': r'Total Counted:\s*(\d+) cycles'
-        }
-        
-        for key, pattern in cycle_patterns.items():
-            match = re.search(pattern, cycle_text)
+        for key, pattern in _CYCLE_PATTERNS.items():
+            match = pattern.search(cycle_text)
             if match:
                 cycle_stats[key] = int(match.group(1))
     
     return cycle_stats
 
 
+# Histogram lines shared by every histogram section
+_HISTOGRAM_TOTAL_RE = re.compile(r"Total samples:\s*(\d+)")
+# Ranged bins like [ 0- 0] or [ 3- 7]
+_HISTOGRAM_BIN_RE = re.compile(r"Bin \[\s*(\d+)\s*-\s*(\d+)\s*\]:\s*(\d+)\s+samples \(([\d.]+)%\)")
+_HISTOGRAM_OOB_RE = re.compile(r"Out of bounds:\s*(\d+)\s+samples \(([\d.]+)%\)")
+
+
+@lru_cache(maxsize=None)
+def _histogram_section_re(section_title):
+    """Compiled pattern for the body of one titled histogram section."""
+    return re.compile(rf"=+\[\s*{re.escape(section_title)}\s*\]=+\n(.*?)\n=+", re.DOTALL)
+
+
 def parse_histogram(content, section_title: str, key_prefix: str):
     """Generic histogram parser for sections with 'Total samples' and 'Bin' lines."""
     out = {}
-    section = re.search(rf"=+\[\s*{re.escape(section_title)}\s*\]=+\n(.*?)\n=+", content, re.DOTALL)
+    section = _histogram_section_re(section_title).search(content)
     if not section:
         return out
 
     text = section.group(1)
-    total_match = re.search(r"Total samples:\s*(\d+)", text)
+    total_match = _HISTOGRAM_TOTAL_RE.search(text)
     if total_match:
         out[f"{key_prefix}_total_samples"] = int(total_match.group(1))
 
     bins = {}
-    # Ranged bins like [ 0- 0] or [ 3- 7]
-    bin_pattern = r"Bin \[\s*(\d+)\s*-\s*(\d+)\s*\]:\s*(\d+)\s+samples \(([\d.]+)%\)"
-    for m in re.finditer(bin_pattern, text):
+    for m in _HISTOGRAM_BIN_RE.finditer(text):
         start = int(m.group(1))
         end = int(m.group(2))
         samples = int(m.group(3))
         pct = float(m.group(4))
         key = start if start == end else f"{start}-{end}"
-        bins[key] = {"samples": samples, "percentage": pct}
+        bins[key] = BinStats(samples, pct)
 
     # Optional out-of-bounds
-    oob = re.search(r"Out of bounds:\s*(\d+)\s+samples \(([\d.]+)%\)", text)
+    oob = _HISTOGRAM_OOB_RE.search(text)
     if oob:
-        bins["out_of_bounds"] = {"samples": int(oob.group(1)), "percentage": float(oob.group(2))}
+        bins["out_of_bounds"] = BinStats(int(oob.group(1)), float(oob.group(2)))
 
     if bins:
         out[f"{key_prefix}_bins"] = bins
@@ -944,6 +991,42 @@ def parse_satsolver_log(log_file_path, content):
     return result
 
 
+# Part of every results cache key, so edits to this parser invalidate cached results
+_PARSER_MTIME_NS = os.stat(__file__).st_mtime_ns
+
+
+def _list_log_files(logs_dir, exclude_summary=True):
+    """
+    Return the sorted .log files to parse in logs_dir as a tuple, or () if there are none.
+    
+    The directory is read with a single os.scandir pass whose entries answer the
+    file checks without further stat calls. Listings are not cached, so a later
+    call sees logs written since the previous one.
+    """
+    logs_dir = str(Path(logs_dir))
+    if not os.path.isdir(logs_dir):
+        print(f"Error: Directory {logs_dir} does not exist")
+        return ()
+    
+    with os.scandir(logs_dir) as entries:
+        log_files = [Path(e.path) for e in entries if e.name.endswith('.log') and e.is_file()]
+    if not log_files:
+        print(f"No .log files found in {logs_dir}")
+        return ()
+    
+    # Skip summary files if requested
+    return tuple(log_file for log_file in sorted(log_files)
+                 if not (exclude_summary and 'summary' in log_file.name.lower()))
+
+
+def _parse_log_entry(log_file):
+    """Parse one log file and tag it with its path (module-level so worker processes can pickle it)."""
+    result = parse_log_file(log_file)
+    if result:
+        result['log_path'] = str(log_file)
+    return result
+
+
 def parse_log_directory(logs_dir, exclude_summary=True):
     """
     Parse all log files in a directory.
@@ -955,33 +1038,123 @@ def parse_log_directory(logs_dir, exclude_summary=True):
     Returns:
         List of dictionaries, one per successfully parsed log file
     """
-    logs_dir = Path(logs_dir)
+    results = []
     
-    if not logs_dir.exists():
-        print(f"Error: Directory {logs_dir} does not exist")
-        return []
+    for log_file in _list_log_files(logs_dir, exclude_summary):
+        result = _parse_log_entry(log_file)
+        # Always include result, even if partial or failed
+        if result:
+            results.append(result)
+    
+    return results
+
+
+def parse_log_directory_parallel(logs_dir, exclude_summary=True, workers=None):
+    """
+    Parse all log files in a directory across a pool of worker processes.
     
-    log_files = list(logs_dir.glob("*.log"))
+    Args:
+        logs_dir: Path to directory containing log files
+        exclude_summary: If True, skip files with 'summary' in the name
+        workers: Number of worker processes (default: os.cpu_count())
+    
+    Returns:
+        Same list as parse_log_directory, in the same (sorted file) order
+    """
+    log_files = _list_log_files(logs_dir, exclude_summary)
     if not log_files:
-        print(f"No .log files found in {logs_dir}")
         return []
     
-    results = []
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(log_files) // (4 * workers))
     
-    for log_file in sorted(log_files):
-        # Skip summary files if requested
-        if exclude_summary and 'summary' in log_file.name.lower():
-            continue
-            
-        result = parse_log_file(log_file)
-        # Always include result, even if partial or failed
-        if result:
-            result['log_path'] = str(log_file)
-            results.append(result)
+    with multiprocessing.Pool(workers) as pool:
+        results = [r for r in pool.imap_unordered(_parse_log_entry, log_files, chunksize=chunksize) if r]
     
+    # Workers finish out of order; restore the serial parser's file order
+    results.sort(key=lambda r: r['log_path'])
     return results
 
 
+def _log_cache_file(cache_dir, logs_dir, log_files):
+    """
+    Cache file for one directory's parsed results.
+    
+    The key covers the directory (as given and resolved), the name, size and
+    mtime of every log file in it, and this parser's own mtime, so adding,
+    rewriting or re-parsing logs with a changed parser all miss the cache.
+    """
+    key = hashlib.sha1()
+    key.update(f"{logs_dir}|{Path(logs_dir).resolve()}|{_PARSER_MTIME_NS}".encode())
+    for log_file in log_files:
+        st = log_file.stat()
+        key.update(f"|{log_file.name}|{st.st_size}|{st.st_mtime_ns}".encode())
+    return Path(cache_dir).expanduser() / f"{key.hexdigest()}.pkl"
+
+
+def parse_log_directories_parallel(logs_dirs, exclude_summary=True, workers=None, cache_dir=None):
+    """
+    Parse the log files of several directories through one pool of worker processes.
+    
+    Files from all directories are pooled together, so a few large directories
+    do not leave workers idle the way one task per directory would.
+    
+    Args:
+        logs_dirs: Sequence of paths to directories containing log files
+        exclude_summary: If True, skip files with 'summary' in the name
+        workers: Number of worker processes (default: os.cpu_count()); 1 parses
+                 in this process without a pool, which keeps debuggers usable
+        cache_dir: If set, directory of pickled per-directory results; unchanged
+                   directories are loaded from it and newly parsed ones are saved
+    
+    Returns:
+        List with one entry per directory in logs_dirs, each the same list
+        parse_log_directory would return for it
+    """
+    dir_files = [_list_log_files(d, exclude_summary) for d in logs_dirs]
+    dir_results = [[] if not files else None for files in dir_files]
+    
+    cache_files = [None] * len(dir_files)
+    if cache_dir:
+        for i, (logs_dir, files) in enumerate(zip(logs_dirs, dir_files)):
+            if not files:
+                continue
+            cache_files[i] = _log_cache_file(cache_dir, logs_dir, files)
+            try:
+                with open(cache_files[i], 'rb') as f:
+                    dir_results[i] = pickle.load(f)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                pass
+    
+    pending = [i for i, results in enumerate(dir_results) if results is None]
+    log_files = [f for i in pending for f in dir_files[i]]
+    if not log_files:
+        return dir_results
+    
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(log_files) // (4 * workers))
+    
+    # Pool.imap keeps input order, so results split back by directory file counts
+    with (multiprocessing.Pool(workers) if workers > 1 else contextlib.nullcontext()) as pool:
+        if pool is None:
+            parsed = map(_parse_log_entry, log_files)
+        else:
+            parsed = pool.imap(_parse_log_entry, log_files, chunksize=chunksize)
+        for i in pending:
+            dir_results[i] = [r for r in (next(parsed) for _ in dir_files[i]) if r]
+    
+    for i in pending:
+        if cache_files[i] is not None:
+            # Write then rename, so an interrupted run never leaves a truncated cache file
+            cache_files[i].parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_files[i].with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(dir_results[i], f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_files[i])
+    
+    return dir_results
+
+
 def get_cache_size_from_directory(directory_name):
     """Extract cache size in bytes from directory name like 'logs_4MiB'."""
     size_match = re.search(r'logs_(?:ddr_)?(\d+)([KMG]i?B)', directory_name)